@@ -1,8 +1,21 @@
 """
 Admin configuration for Student Eye Drowsiness Detection System
 """
-from django.contrib import admin
-from .models import SessionLog, UserProfile
+import csv
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .enrollment import OPTIONAL_COLUMNS, REQUIRED_COLUMNS, import_students, read_rows
+from .models import SessionLog, UserProfile, DailyRollup
+
+
+class StudentImportForm(forms.Form):
+    csv_file = forms.FileField(label='CSV file')
+    dry_run = forms.BooleanField(required=False, label='Validate only (create nobody)')
 
 
 @admin.register(SessionLog)
@@ -22,6 +35,56 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_filter = ['batch_year', 'created_at']
     search_fields = ['user__username', 'user__email', 'enrollment_no']
     readonly_fields = ['total_sessions', 'total_alerts', 'created_at']
+    change_list_template = 'admin/drowsiness_app/userprofile/change_list.html'
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('user')
\ No newline at end of file
+        return super().get_queryset(request).select_related('user')
+    
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_students_view),
+                 name='drowsiness_app_userprofile_import'),
+        ] + super().get_urls()
+    
+    def import_students_view(self, request):
+        """
+        Bulk-enroll students from an uploaded CSV file
+        """
+        if not request.user.has_perm('auth.add_user'):
+            messages.error(request, 'You need permission to add users to import students.')
+            form = None
+        else:
+            form = StudentImportForm(request.POST or None, request.FILES or None)
+        
+        report = None
+        if form is not None and form.is_valid():
+            try:
+                csv_file = io.TextIOWrapper(form.cleaned_data['csv_file'].file, encoding='utf-8-sig', newline='')
+                rows = read_rows(csv_file)
+            except (UnicodeDecodeError, ValueError, csv.Error) as e:
+                messages.error(request, f"Can't read the CSV file: {e}")
+            else:
+                report = import_students(rows, dry_run=form.cleaned_data['dry_run'])
+                if report['dry_run']:
+                    messages.info(request, f"{report['valid']} of {report['rows']} rows are valid.")
+                else:
+                    messages.success(request, f"Created {report['created']} of {report['rows']} students "
+                                              f"in {report['seconds']['total']:.1f} s.")
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import students',
+            'form': form,
+            'report': report,
+            'required_columns': REQUIRED_COLUMNS,
+            'optional_columns': OPTIONAL_COLUMNS,
+        }
+        return TemplateResponse(request, 'admin/drowsiness_app/userprofile/import_students.html', context)
+
+
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'hour', 'batch_year', 'session_count', 'alert_count', 'monitored_seconds']
+    list_filter = ['batch_year', 'date']
+    readonly_fields = ['date', 'hour', 'batch_year', 'session_count', 'alert_count', 'monitored_seconds']
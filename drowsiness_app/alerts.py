@@ -0,0 +1,342 @@
+"""
+Alert Dispatch
+Student Eye Drowsiness Detection System
+This module delivers drowsiness alerts through a single long-lived worker
+thread. Detectors only enqueue an alert (non-blocking); the worker fans it
+out to pluggable sinks (local sound, browser push, webhook, log, database).
+Noisy sinks are rate limited per session, so a burst of alerts across many
+sessions costs one queue entry each instead of a thread and a shell process.
+"""
+
+import json
+import logging
+import platform
+import queue
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque
+from datetime import datetime, timezone as dt_timezone
+
+# Audio alert imports
+try:
+    if platform.system() == "Windows":
+        import winsound
+except ImportError:
+    print("Warning: Audio alert libraries not available")
+
+
+logger = logging.getLogger('sedds.alerts')
+
+
+def play_beep():
+    """
+    Sound the local alert (system beep on Windows, terminal bell elsewhere)
+    """
+    try:
+        if platform.system() == "Windows":
+            winsound.Beep(1000, 500)  # 1000Hz for 500ms
+        else:
+            sys.stdout.write('\a')
+            sys.stdout.flush()
+    except Exception as e:
+        print(f"Could not play alert sound: {e}")
+
+
+class Alert:
+    """
+    A drowsiness alert
+    
+    Args:
+        key: Rate-limiting key, e.g. 'user:42' or 'camera:0:face:3'
+        user_id: Student the alert belongs to (None if unknown)
+        source: What raised it ('detector', 'room', ...)
+        details: Extra JSON-serialisable information
+    """
+    
+    def __init__(self, key, user_id=None, source='detector', details=None, timestamp=None):
+        self.key = key
+        self.user_id = user_id
+        self.source = source
+        self.details = details or {}
+        self.timestamp = timestamp if timestamp is not None else time.time()
+    
+    def isoformat(self):
+        """Alert time as an aware ISO 8601 string"""
+        return datetime.fromtimestamp(self.timestamp, tz=dt_timezone.utc).isoformat()
+    
+    def to_dict(self):
+        return {
+            'key': self.key,
+            'user_id': self.user_id,
+            'source': self.source,
+            'timestamp': self.isoformat(),
+            'details': self.details,
+        }
+
+
+class AlertSink:
+    """
+    Base class for alert destinations
+    """
+    
+    name = 'sink'
+    rate_limited = True  # Skip alerts repeated within the dispatcher's interval
+    
+    def emit(self, alert):
+        raise NotImplementedError
+
+
+class SoundSink(AlertSink):
+    """Local beep, without spawning a shell"""
+    
+    name = 'sound'
+    
+    def emit(self, alert):
+        play_beep()
+
+
+class LogSink(AlertSink):
+    """Write alerts to the 'sedds.alerts' logger"""
+    
+    name = 'log'
+    
+    def emit(self, alert):
+        logger.warning("Drowsiness alert: key=%s user=%s source=%s",
+                       alert.key, alert.user_id, alert.source)
+
+
+class BrowserSink(AlertSink):
+    """
+    Queue alerts per user for the browser to collect (pushed over the
+    metadata event stream)
+    """
+    
+    name = 'browser'
+    
+    def __init__(self, max_pending=10):
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+    
+    def emit(self, alert):
+        if alert.user_id is None:
+            return
+        with self._lock:
+            self._pending.setdefault(alert.user_id, deque(maxlen=self.max_pending)).append(alert.to_dict())
+    
+    def pop(self, user_id):
+        """
+        Take the pending alerts for a user
+        
+        Returns:
+            list: Alert dicts, oldest first
+        """
+        with self._lock:
+            pending = self._pending.pop(user_id, None)
+        return list(pending) if pending else []
+
+
+class WebhookSink(AlertSink):
+    """POST alerts as JSON to a URL"""
+    
+    name = 'webhook'
+    
+    def __init__(self, url, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+    
+    def emit(self, alert):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(alert.to_dict()).encode(),
+            headers={'Content-Type': 'application/json'},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class CallbackSink(AlertSink):
+    """
+    Call a function with each alert (e.g. to record it in the database)
+    """
+    
+    def __init__(self, callback, name='callback', rate_limited=False):
+        self.callback = callback
+        self.name = name
+        self.rate_limited = rate_limited
+    
+    def emit(self, alert):
+        self.callback(alert)
+
+
+class AlertDispatcher:
+    """
+    Queue alerts and deliver them to the sinks on one worker thread
+    """
+    
+    def __init__(self, sinks=None, min_interval=5.0, max_queue=1000):
+        """
+        Args:
+            sinks: Initial AlertSink list
+            min_interval: Seconds between deliveries to rate-limited sinks
+                for the same alert key
+            max_queue: Alerts held before new ones are dropped
+        """
+        self.sinks = list(sinks or [])
+        self.min_interval = min_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.last_delivered = {}  # key -> time of the last rate-limited delivery
+        self.dispatched = 0
+        self.dropped = 0
+        self.suppressed = 0
+        self.failed = 0
+        self._worker = None
+        self._lock = threading.Lock()
+    
+    def add_sink(self, sink):
+        """Add a sink (replacing any with the same name)"""
+        self.sinks = [s for s in self.sinks if s.name != sink.name] + [sink]
+    
+    def get_sink(self, name):
+        """Sink with the given name, or None"""
+        for sink in self.sinks:
+            if sink.name == name:
+                return sink
+        return None
+    
+    def dispatch(self, alert):
+        """
+        Enqueue an alert without blocking
+        
+        Returns:
+            bool: False if the queue was full and the alert was dropped
+        """
+        self._ensure_worker()
+        try:
+            self.queue.put_nowait(alert)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.dispatched += 1
+        return True
+    
+    def forget(self, key):
+        """Drop rate-limit state for a key (e.g. when its session ends)"""
+        self.last_delivered.pop(key, None)
+    
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True, name='sedds-alerts')
+                self._worker.start()
+    
+    def _run(self):
+        while True:
+            alert = self.queue.get()
+            if alert is None:
+                break
+            try:
+                self._deliver(alert)
+            finally:
+                self.queue.task_done()
+    
+    def _deliver(self, alert):
+        last = self.last_delivered.get(alert.key)
+        throttled = last is not None and alert.timestamp - last < self.min_interval
+        if throttled:
+            self.suppressed += 1
+        else:
+            self.last_delivered[alert.key] = alert.timestamp
+        
+        for sink in self.sinks:
+            if throttled and sink.rate_limited:
+                continue
+            try:
+                sink.emit(alert)
+            except Exception as e:
+                self.failed += 1
+                print(f"Warning: Alert sink '{sink.name}' failed: {e}")
+    
+    def flush(self, timeout=5.0):
+        """
+        Wait until queued alerts are delivered
+        
+        Returns:
+            bool: True if the queue drained within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+    
+    def stop(self):
+        """Stop the worker after the queued alerts"""
+        if self._worker is not None and self._worker.is_alive():
+            self.queue.put(None)
+            self._worker.join(timeout=5.0)
+        self._worker = None
+    
+    def stats(self):
+        return {
+            'queued': self.queue.qsize(),
+            'dispatched': self.dispatched,
+            'dropped': self.dropped,
+            'suppressed': self.suppressed,
+            'failed': self.failed,
+            'sinks': [sink.name for sink in self.sinks],
+        }
+
+
+_default_dispatcher = None
+_default_lock = threading.Lock()
+
+
+def build_sinks(names, webhook_url=None):
+    """
+    Create sinks from names ('sound', 'browser', 'log', 'webhook')
+    """
+    sinks = []
+    for name in names:
+        name = name.strip()
+        if name == 'sound':
+            sinks.append(SoundSink())
+        elif name == 'browser':
+            sinks.append(BrowserSink())
+        elif name == 'log':
+            sinks.append(LogSink())
+        elif name == 'webhook':
+            if webhook_url:
+                sinks.append(WebhookSink(webhook_url))
+            else:
+                print("Warning: 'webhook' alert sink needs SEDDS_ALERT_WEBHOOK_URL, skipping")
+        elif name:
+            print(f"Warning: Unknown alert sink '{name}', skipping")
+    return sinks
+
+
+def get_dispatcher():
+    """
+    Process-wide dispatcher, configured from Django settings when available
+    (SEDDS_ALERT_SINKS, SEDDS_ALERT_WEBHOOK_URL, SEDDS_ALERT_MIN_INTERVAL)
+    """
+    global _default_dispatcher
+    if _default_dispatcher is None:
+        with _default_lock:
+            if _default_dispatcher is None:
+                names, webhook_url, min_interval = ['sound'], None, 5.0
+                try:
+                    from django.conf import settings
+                    if settings.configured:
+                        names = getattr(settings, 'SEDDS_ALERT_SINKS', names)
+                        webhook_url = getattr(settings, 'SEDDS_ALERT_WEBHOOK_URL', None)
+                        min_interval = getattr(settings, 'SEDDS_ALERT_MIN_INTERVAL', min_interval)
+                except ImportError:
+                    pass
+                _default_dispatcher = AlertDispatcher(build_sinks(names, webhook_url), min_interval=min_interval)
+    return _default_dispatcher
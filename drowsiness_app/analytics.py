@@ -0,0 +1,195 @@
+"""
+Cohort Analytics
+Student Eye Drowsiness Detection System
+This module maintains the DailyRollup table incrementally and builds
+instructor reports (per batch, hour of day and weekday) from it.
+"""
+
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import ExtractWeekDay
+from django.utils import timezone
+
+from .models import SessionLog, UserProfile, DailyRollup
+
+
+# ExtractWeekDay numbering (1 = Sunday)
+WEEKDAY_NAMES = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+
+
+def _session_buckets(session):
+    """
+    Split a session into local (date, hour) buckets
+    
+    Monitored time is spread over the hours the session spans and each
+    alert is counted in the hour it happened.
+    
+    Returns:
+        dict: (date, hour) -> [session_count, alert_count, monitored_seconds]
+    """
+    buckets = defaultdict(lambda: [0, 0, 0.0])
+    start = timezone.localtime(session.session_start)
+    end = timezone.localtime(session.session_end)
+    
+    buckets[(start.date(), start.hour)][0] += 1
+    
+    # Monitored seconds per hour
+    cursor = start
+    while cursor < end:
+        next_hour = cursor.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        segment_end = min(next_hour, end)
+        buckets[(cursor.date(), cursor.hour)][2] += (segment_end - cursor).total_seconds()
+        cursor = segment_end
+    
+    # Alerts in the hour they were raised
+    try:
+        timestamps = json.loads(session.drowsy_timestamps)
+    except (json.JSONDecodeError, TypeError):
+        timestamps = []
+    
+    for timestamp in timestamps:
+        try:
+            alert_time = datetime.fromisoformat(timestamp)
+        except (TypeError, ValueError):
+            alert_time = session.session_start
+        if timezone.is_naive(alert_time):
+            alert_time = timezone.make_aware(alert_time)
+        alert_time = timezone.localtime(alert_time)
+        buckets[(alert_time.date(), alert_time.hour)][1] += 1
+    
+    # Alerts beyond the recorded timestamps go to the start hour
+    missing_alerts = session.alert_count - len(timestamps)
+    if missing_alerts > 0:
+        buckets[(start.date(), start.hour)][1] += missing_alerts
+    
+    return buckets
+
+
+def rollup_session(session, batch_year=None):
+    """
+    Add an ended session to the daily rollups (at most once)
+    
+    Returns:
+        bool: True if the session was rolled up by this call
+    """
+    if session.session_end is None:
+        return False
+    
+    if batch_year is None:
+        batch_year = UserProfile.objects.filter(user_id=session.user_id).values_list(
+            'batch_year', flat=True).first()
+    batch_year = batch_year or ''
+    
+    with transaction.atomic():
+        # Claim the session so concurrent refreshes don't count it twice
+        claimed = SessionLog.objects.filter(pk=session.pk, rolled_up=False).update(rolled_up=True)
+        if not claimed:
+            return False
+        
+        for (date, hour), (sessions, alerts, seconds) in _session_buckets(session).items():
+            rollup, _ = DailyRollup.objects.get_or_create(date=date, hour=hour, batch_year=batch_year)
+            DailyRollup.objects.filter(pk=rollup.pk).update(
+                session_count=F('session_count') + sessions,
+                alert_count=F('alert_count') + alerts,
+                monitored_seconds=F('monitored_seconds') + seconds,
+            )
+    
+    session.rolled_up = True
+    return True
+
+
+def refresh_rollups(chunk_size=500):
+    """
+    Roll up every ended session not yet included
+    
+    Returns:
+        int: Number of sessions rolled up
+    """
+    pending = SessionLog.objects.filter(session_end__isnull=False, rolled_up=False).order_by('pk')
+    count = 0
+    last_pk = 0
+    
+    while True:
+        chunk = list(pending.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        
+        batches = dict(UserProfile.objects.filter(
+            user_id__in={session.user_id for session in chunk}
+        ).values_list('user_id', 'batch_year'))
+        
+        for session in chunk:
+            if rollup_session(session, batch_year=batches.get(session.user_id) or ''):
+                count += 1
+        last_pk = chunk[-1].pk
+    
+    return count
+
+
+def rebuild_rollups(chunk_size=500):
+    """
+    Recompute all rollups from scratch
+    
+    Returns:
+        int: Number of sessions rolled up
+    """
+    with transaction.atomic():
+        DailyRollup.objects.all().delete()
+        SessionLog.objects.filter(rolled_up=True).update(rolled_up=False)
+    return refresh_rollups(chunk_size=chunk_size)
+
+
+def _rates(rows):
+    """
+    Add derived rates to aggregated rollup rows
+    """
+    for row in rows:
+        hours = (row['monitored_seconds'] or 0) / 3600.0
+        row['monitored_hours'] = round(hours, 2)
+        row['alerts_per_hour'] = round(row['alert_count'] / hours, 2) if hours else 0.0
+        row['alerts_per_session'] = round(row['alert_count'] / row['session_count'], 2) if row['session_count'] else 0.0
+    return rows
+
+
+def cohort_report(batch_year=None, start_date=None, end_date=None):
+    """
+    Drowsiness rates per batch, hour of day and weekday
+    
+    Args:
+        batch_year: Only include this batch
+        start_date, end_date: Inclusive local date range
+    
+    Returns:
+        dict: Lists of rows under 'batches', 'hours' and 'weekdays'
+    """
+    rollups = DailyRollup.objects.all()
+    if batch_year:
+        rollups = rollups.filter(batch_year=batch_year)
+    if start_date:
+        rollups = rollups.filter(date__gte=start_date)
+    if end_date:
+        rollups = rollups.filter(date__lte=end_date)
+    
+    totals = {
+        'session_count': Sum('session_count'),
+        'alert_count': Sum('alert_count'),
+        'monitored_seconds': Sum('monitored_seconds'),
+    }
+    
+    batches = _rates(list(rollups.values('batch_year').annotate(**totals).order_by('batch_year')))
+    hours = _rates(list(rollups.values('hour').annotate(**totals).order_by('hour')))
+    weekdays = _rates(list(
+        rollups.annotate(weekday=ExtractWeekDay('date')).values('weekday').annotate(**totals).order_by('weekday')
+    ))
+    for row in weekdays:
+        row['weekday_name'] = WEEKDAY_NAMES[row['weekday'] - 1]
+    
+    return {
+        'batches': batches,
+        'hours': hours,
+        'weekdays': weekdays,
+    }
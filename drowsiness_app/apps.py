@@ -3,4 +3,10 @@ from django.apps import AppConfig
 
 class DrowsinessAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'drowsiness_app'
\ No newline at end of file
+    name = 'drowsiness_app'
+    
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .db import configure_sqlite
+        
+        connection_created.connect(configure_sqlite, dispatch_uid='sedds_configure_sqlite')
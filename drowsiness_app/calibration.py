@@ -0,0 +1,131 @@
+"""
+Per-User EAR Calibration
+Student Eye Drowsiness Detection System
+This module estimates a student's open-eye EAR at the start of a session
+and derives a personal drowsiness threshold. Quantiles are estimated with
+the P-square algorithm, so no frames or EAR samples are buffered.
+"""
+
+
+class P2QuantileEstimator:
+    """
+    Streaming quantile estimate using five markers (Jain & Chlamtac P-square)
+    """
+    
+    def __init__(self, quantile):
+        self.quantile = quantile
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self.increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+    
+    def update(self, value):
+        """Add a sample"""
+        self.count += 1
+        
+        # The first five samples initialise the markers
+        if self.count <= 5:
+            self.heights.append(value)
+            self.heights.sort()
+            return
+        
+        # Find the cell containing the sample, extending the extremes
+        if value < self.heights[0]:
+            self.heights[0] = value
+            cell = 0
+        elif value >= self.heights[4]:
+            self.heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= self.heights[cell + 1]:
+                cell += 1
+        
+        for i in range(cell + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        
+        # Adjust the middle markers towards their desired positions
+        for i in range(1, 4):
+            offset = self.desired[i] - self.positions[i]
+            if (offset >= 1 and self.positions[i + 1] - self.positions[i] > 1) or \
+               (offset <= -1 and self.positions[i - 1] - self.positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not self.heights[i - 1] < height < self.heights[i + 1]:
+                    height = self._linear(i, step)
+                self.heights[i] = height
+                self.positions[i] += step
+    
+    def _parabolic(self, i, step):
+        n, q = self.positions, self.heights
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+    
+    def _linear(self, i, step):
+        n, q = self.positions, self.heights
+        return q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+    
+    def value(self):
+        """
+        Current quantile estimate (None before any samples)
+        """
+        if not self.heights:
+            return None
+        if self.count <= 5:
+            # Exact quantile of the few samples seen so far
+            index = min(int(round(self.quantile * (len(self.heights) - 1))), len(self.heights) - 1)
+            return self.heights[index]
+        return self.heights[2]
+
+
+class EARCalibrator:
+    """
+    Estimate a personal EAR threshold from open-eye samples
+    
+    The threshold is a fixed fraction of the student's median open-eye
+    EAR, clamped to a sensible range.
+    """
+    
+    def __init__(self, samples=150, ratio=0.75, min_threshold=0.15, max_threshold=0.35):
+        self.samples = samples  # Processed frames with a face (~10 s)
+        self.ratio = ratio
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.median = P2QuantileEstimator(0.5)
+    
+    def update(self, ear):
+        """
+        Add an open-eye EAR sample
+        
+        Returns:
+            bool: True once enough samples have been collected
+        """
+        if not self.is_complete():
+            self.median.update(ear)
+        return self.is_complete()
+    
+    def is_complete(self):
+        """Whether calibration has enough samples"""
+        return self.median.count >= self.samples
+    
+    def progress(self):
+        """Calibration progress from 0 to 1"""
+        return min(self.median.count / self.samples, 1.0)
+    
+    def baseline(self):
+        """Median open-eye EAR"""
+        return self.median.value()
+    
+    def threshold(self):
+        """
+        Personal drowsiness threshold (None before any samples)
+        """
+        baseline = self.baseline()
+        if baseline is None:
+            return None
+        return min(max(baseline * self.ratio, self.min_threshold), self.max_threshold)
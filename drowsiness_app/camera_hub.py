@@ -0,0 +1,212 @@
+"""
+Room Camera Multiplexing
+Student Eye Drowsiness Detection System
+This module runs one capture thread per room camera, each with its own
+multi-face detector, and maps tracked faces to the students they belong to.
+"""
+
+import cv2
+import threading
+import time
+
+from django.db import connection
+
+from .multi_face import MultiFaceDetector
+from .frame_sources import open_source, FrameSourceError
+
+
+class CameraWorker(threading.Thread):
+    """
+    Capture and multi-face detection loop for a single camera
+    """
+    
+    def __init__(self, camera_index, max_num_faces=4, profile=None):
+        super().__init__(daemon=True, name=f"sedds-camera-{camera_index}")
+        self.camera_index = camera_index
+        self.detector = MultiFaceDetector(max_num_faces=max_num_faces, profile=profile)
+        self.detector.on_face_drowsy = self._on_face_drowsy
+        
+        # Face ID -> user ID and face ID -> the user's EAR threshold
+        # (shared with the detector for alerts and per-student checks)
+        self.face_owners = {}
+        self.face_thresholds = {}
+        self.detector.face_owners = self.face_owners
+        self.detector.face_thresholds = self.face_thresholds
+        self.detector.alert_key = f"camera:{camera_index}"
+        
+        # Callback with (user_id, camera_index, face_id) for assigned faces
+        self.on_user_drowsy = None
+        # Callback with (camera_index, user IDs of the assigned faces) after
+        # each frame, e.g. to keep the students' sessions alive
+        self.on_frame = None
+        
+        self.is_running = False
+        self.error = None
+        self._lock = threading.Lock()
+        self._frame = None
+        self._faces = []
+        self._frame_seq = 0
+        self._jpeg = None
+        self._jpeg_seq = -1
+    
+    def run(self):
+        """
+        Capture frames until stopped
+        """
+        self.is_running = True
+        source = open_source(self.camera_index, size=self.detector.display_size, prefetch=2)
+        
+        try:
+            for _, frame in source:
+                if not self.is_running:
+                    break
+                
+                processed_frame, faces = self.detector.process_frame(frame)
+                
+                with self._lock:
+                    self._frame = processed_frame
+                    self._faces = faces
+                    self._frame_seq += 1
+                
+                if self.on_frame:
+                    self.on_frame(self.camera_index, list(self.face_owners.values()))
+        except FrameSourceError:
+            self.error = "Could not open camera"
+        finally:
+            source.close()
+            self.detector.release()
+            self.is_running = False
+            # Alert writes ran on this thread; don't leave a persistent connection behind
+            connection.close()
+    
+    def stop(self):
+        """Stop the capture loop"""
+        self.is_running = False
+    
+    def _on_face_drowsy(self, face_id):
+        user_id = self.face_owners.get(face_id)
+        if user_id is not None and self.on_user_drowsy:
+            self.on_user_drowsy(user_id, self.camera_index, face_id)
+    
+    def assign_face(self, face_id, user_id, ear_threshold=None):
+        """
+        Map a tracked face to a user (None to unassign)
+        
+        Args:
+            face_id: Tracked face ID
+            user_id: User ID, or None to unassign
+            ear_threshold: The user's calibrated EAR threshold (None for
+                the detector's default)
+        
+        Returns:
+            int: The assigned (or unassigned) user ID
+        """
+        if user_id is None:
+            self.face_thresholds.pop(face_id, None)
+            return self.face_owners.pop(face_id, None)
+        if ear_threshold is None:
+            self.face_thresholds.pop(face_id, None)
+        else:
+            self.face_thresholds[face_id] = ear_threshold
+        self.face_owners[face_id] = user_id
+        return user_id
+    
+    def get_faces(self):
+        """
+        Get the latest face states with their assigned users
+        """
+        with self._lock:
+            faces = [dict(face) for face in self._faces]
+        for face in faces:
+            face['user_id'] = self.face_owners.get(face['id'])
+        return faces
+    
+    def get_jpeg(self):
+        """
+        Get the latest frame as JPEG bytes (encoded once per frame)
+        
+        Returns:
+            tuple: (frame sequence number, JPEG bytes or None)
+        """
+        with self._lock:
+            if self._jpeg_seq != self._frame_seq and self._frame is not None:
+                ret, buffer = cv2.imencode('.jpg', self._frame)
+                if ret:
+                    self._jpeg = buffer.tobytes()
+                    self._jpeg_seq = self._frame_seq
+            return self._jpeg_seq, self._jpeg
+    
+    def stream(self, interval=0.033):
+        """
+        Generate an MJPEG stream of the camera for any number of viewers
+        """
+        last_seq = -1
+        while self.is_alive():
+            seq, jpeg = self.get_jpeg()
+            if jpeg is not None and seq != last_seq:
+                last_seq = seq
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
+            time.sleep(interval)
+
+
+class CameraHub:
+    """
+    Registry of running camera workers, one per camera source
+    """
+    
+    def __init__(self, max_num_faces=4):
+        self.max_num_faces = max_num_faces
+        self.workers = {}
+        self.on_user_drowsy = None
+        self.on_frame = None
+        self._lock = threading.Lock()
+    
+    def start(self, camera_index, profile=None):
+        """
+        Start (or return the running) worker for a camera
+        
+        Args:
+            camera_index: Camera source
+            profile: Detector profile for a new worker (a running worker
+                keeps its own)
+        """
+        with self._lock:
+            worker = self.workers.get(camera_index)
+            if worker is None or not worker.is_alive():
+                worker = CameraWorker(camera_index, max_num_faces=self.max_num_faces, profile=profile)
+                worker.on_user_drowsy = self._on_user_drowsy
+                worker.on_frame = self._on_frame
+                self.workers[camera_index] = worker
+                worker.start()
+            return worker
+    
+    def get(self, camera_index):
+        """Get the worker for a camera, if any"""
+        return self.workers.get(camera_index)
+    
+    def stop(self, camera_index):
+        """
+        Stop a camera worker
+        
+        Returns:
+            CameraWorker: The stopped worker, or None
+        """
+        with self._lock:
+            worker = self.workers.pop(camera_index, None)
+        if worker is not None:
+            worker.stop()
+        return worker
+    
+    def stop_all(self):
+        """Stop every camera worker"""
+        for camera_index in list(self.workers.keys()):
+            self.stop(camera_index)
+    
+    def _on_user_drowsy(self, user_id, camera_index, face_id):
+        if self.on_user_drowsy:
+            self.on_user_drowsy(user_id, camera_index, face_id)
+    
+    def _on_frame(self, camera_index, user_ids):
+        if self.on_frame:
+            self.on_frame(camera_index, user_ids)
@@ -0,0 +1,38 @@
+"""
+Database Connection Setup
+Student Eye Drowsiness Detection System
+This module tunes new SQLite connections for concurrent use: WAL journaling
+so readers don't block the writer, a busy timeout so writers wait for a
+lock instead of failing, and relaxed fsync (safe with WAL).
+"""
+
+from django.conf import settings
+
+
+SQLITE_JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SQLITE_SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    connection_created handler applying the SQLite PRAGMAs
+    """
+    if connection.vendor != 'sqlite':
+        return
+    
+    journal_mode = getattr(settings, 'SQLITE_JOURNAL_MODE', 'WAL').upper()
+    synchronous = getattr(settings, 'SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+    timeout = connection.settings_dict.get('OPTIONS', {}).get('timeout', 20)
+    
+    with connection.cursor() as cursor:
+        if journal_mode in SQLITE_JOURNAL_MODES:
+            cursor.execute(f'PRAGMA journal_mode={journal_mode}')
+        else:
+            print(f"Warning: Unknown SQLITE_JOURNAL_MODE '{journal_mode}', ignoring")
+        
+        if synchronous in SQLITE_SYNCHRONOUS_MODES:
+            cursor.execute(f'PRAGMA synchronous={synchronous}')
+        else:
+            print(f"Warning: Unknown SQLITE_SYNCHRONOUS '{synchronous}', ignoring")
+        
+        cursor.execute(f'PRAGMA busy_timeout={int(timeout * 1000)}')
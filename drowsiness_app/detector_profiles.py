@@ -0,0 +1,228 @@
+"""
+Detector Profiles
+Student Eye Drowsiness Detection System
+This module defines named detector profiles that trade landmark accuracy for
+per-frame cost (face mesh with or without iris refinement, smaller
+processing sizes, Haar cascade tracking), and a short micro-benchmark that
+picks the most accurate profile meeting a per-frame latency target on the
+machine it runs on. For 'auto', the benchmark runs in the background when
+the server starts (or through the benchmark_profiles command) and its choice
+is cached, so no request waits for it.
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+
+# Ordered from most accurate to cheapest; 'auto' picks the first profile
+# whose measured latency meets the target
+DETECTOR_PROFILES = {
+    'accurate': {
+        'backend': 'mediapipe',
+        'refine_landmarks': True,
+        'process_size': (320, 240),
+        'description': 'Face mesh with iris refinement',
+    },
+    'balanced': {
+        'backend': 'mediapipe',
+        'refine_landmarks': False,
+        'process_size': (320, 240),
+        'description': 'Face mesh without iris refinement',
+    },
+    'fast': {
+        'backend': 'mediapipe',
+        'refine_landmarks': False,
+        'process_size': (240, 180),
+        'description': 'Face mesh on smaller frames',
+    },
+    'haar': {
+        'backend': 'haar',
+        'process_size': (320, 240),
+        'haar_redetect_interval': 10,
+        'description': 'Haar cascades with face tracking',
+    },
+}
+
+DEFAULT_PROFILE = 'accurate'
+AUTO_PROFILE = 'auto'
+
+# Used for 'auto' until the benchmark has finished (cheap, still face mesh)
+AUTO_FALLBACK_PROFILE = 'fast'
+
+# Profiles finding a face on fewer benchmark frames than the best one, by
+# more than this share, aren't selected: skipping the landmark work makes
+# them look fast
+FACE_RATE_TOLERANCE = 0.05
+
+# Choice of the auto benchmark per latency target; also stored in the cache
+# so processes sharing a cache backend benchmark once
+AUTO_PROFILE_CACHE_KEY = 'sedds:auto_profile:{target_ms}'
+_auto_profiles = {}
+_auto_threads = {}
+_auto_lock = threading.Lock()
+
+
+def get_profile(name):
+    """
+    Settings of a named profile
+    
+    Raises:
+        ValueError: If the profile doesn't exist
+    """
+    try:
+        return DETECTOR_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown detector profile '{name}' (choose from {', '.join(DETECTOR_PROFILES)})")
+
+
+def benchmark_profiles(names=None, frames=None, n_frames=40, warmup=5):
+    """
+    Measure the per-frame detection latency of each profile
+    
+    Args:
+        names: Profiles to measure (default: all, in accuracy order)
+        frames: Frames to detect on (default: generated synthetic face frames)
+        n_frames: Frames timed per profile
+        warmup: Untimed frames first (model loading, caches)
+    
+    Returns:
+        list: One dict per runnable profile with its mean and p95 latency
+        (ms, resize included) and the share of frames with a face found
+    """
+    # Imported here: the detector itself imports this module
+    from .drowsiness_detector import DrowsinessDetector, MEDIAPIPE_AVAILABLE
+    from .frame_sources import SyntheticSource
+    
+    if frames is None:
+        with SyntheticSource(max_frames=n_frames + warmup) as source:
+            frames = [frame for _, frame in source]
+    
+    results = []
+    for name in names or DETECTOR_PROFILES:
+        if get_profile(name)['backend'] == 'mediapipe' and not MEDIAPIPE_AVAILABLE:
+            continue
+        
+        detector = DrowsinessDetector(render_overlay=False, profile=name)
+        latencies = []
+        faces = 0
+        for i in range(n_frames + warmup):
+            frame = frames[i % len(frames)]
+            start = time.perf_counter()
+            ear = detector.detect_eyes(cv2.resize(frame, detector.process_size))
+            elapsed = time.perf_counter() - start
+            if i >= warmup:
+                latencies.append(elapsed * 1000)
+                faces += ear is not None
+        detector.release()
+        
+        results.append({
+            'profile': name,
+            'mean_ms': round(float(np.mean(latencies)), 2),
+            'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+            'face_rate': round(faces / n_frames, 3),
+        })
+    return results
+
+
+def select_profile(results, target_ms):
+    """
+    Most accurate benchmarked profile whose p95 latency meets the target,
+    or the fastest one if none does
+    
+    Only profiles whose face rate is within FACE_RATE_TOLERANCE of the best
+    one are considered.
+    """
+    if not results:
+        return 'haar'
+    best_face_rate = max(result['face_rate'] for result in results)
+    results = [result for result in results if result['face_rate'] >= best_face_rate - FACE_RATE_TOLERANCE]
+    for result in results:
+        if result['p95_ms'] <= target_ms:
+            return result['profile']
+    return min(results, key=lambda result: result['p95_ms'])['profile']
+
+
+def store_auto_profile(target_ms, profile):
+    """
+    Remember the auto benchmark's choice for a latency target
+    """
+    _auto_profiles[target_ms] = profile
+    cache.set(AUTO_PROFILE_CACHE_KEY.format(target_ms=target_ms), profile, None)
+
+
+def _cached_auto_profile(target_ms):
+    profile = _auto_profiles.get(target_ms)
+    if profile is None:
+        profile = cache.get(AUTO_PROFILE_CACHE_KEY.format(target_ms=target_ms))
+        if profile in DETECTOR_PROFILES:
+            _auto_profiles[target_ms] = profile
+    return profile if profile in DETECTOR_PROFILES else None
+
+
+def _run_auto_benchmark(target_ms):
+    try:
+        results = benchmark_profiles()
+    except Exception as e:
+        print(f"Warning: Detector profile benchmark failed, using '{AUTO_FALLBACK_PROFILE}': {e}")
+        return None
+    profile = select_profile(results, target_ms)
+    store_auto_profile(target_ms, profile)
+    print(f"Detector profile benchmark (target {target_ms:.1f} ms): "
+          + ', '.join(f"{r['profile']} {r['p95_ms']:.1f} ms" for r in results)
+          + f" -> {profile}")
+    return profile
+
+
+def start_auto_benchmark(target_ms=None):
+    """
+    Benchmark the profiles on a background thread, unless the choice for
+    the target is already known or being measured
+    
+    Called when the server starts with SEDDS_DETECTOR_PROFILE set to 'auto'.
+    
+    Returns:
+        threading.Thread: The benchmark thread, or None
+    """
+    if target_ms is None:
+        target_ms = settings.SEDDS_DETECTOR_TARGET_MS
+    if _cached_auto_profile(target_ms) is not None:
+        return None
+    
+    with _auto_lock:
+        thread = _auto_threads.get(target_ms)
+        if thread is None:
+            thread = threading.Thread(target=_run_auto_benchmark, args=(target_ms,), daemon=True,
+                                      name='sedds-profile-benchmark')
+            _auto_threads[target_ms] = thread
+            thread.start()
+    return thread
+
+
+def resolve_profile(name, target_ms=20.0, wait=False):
+    """
+    Turn a configured profile name into the one that will actually run
+    
+    'auto' uses the cached benchmark choice. Without one, it starts the
+    background benchmark and uses AUTO_FALLBACK_PROFILE meanwhile, or with
+    wait set (offline tools), runs the benchmark and waits for it. Face mesh
+    profiles resolve to 'haar' when MediaPipe isn't installed.
+    """
+    from .drowsiness_detector import MEDIAPIPE_AVAILABLE
+    
+    name = name or DEFAULT_PROFILE
+    if name == AUTO_PROFILE:
+        name = _cached_auto_profile(target_ms)
+        if name is None:
+            thread = start_auto_benchmark(target_ms)
+            if wait and thread is not None:
+                thread.join()
+            name = _cached_auto_profile(target_ms) or AUTO_FALLBACK_PROFILE
+    
+    if get_profile(name)['backend'] == 'mediapipe' and not MEDIAPIPE_AVAILABLE:
+        return 'haar'
+    return name
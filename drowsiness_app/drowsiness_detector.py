@@ -8,11 +8,16 @@ for real-time drowsiness detection through webcam feed.
 import cv2
 import numpy as np
 import time
-import threading
-import platform
-import os
 from scipy.spatial import distance as dist
 
+from .signal_processing import EARFilter, BlinkDetector, FatigueEstimator
+from .face_metrics import face_signals
+from .calibration import EARCalibrator
+from .frame_sources import open_source
+from .landmark_cache import LandmarkCache
+from .alerts import Alert, get_dispatcher, play_beep
+from .detector_profiles import DEFAULT_PROFILE, get_profile
+
 # MediaPipe for face detection
 try:
     import mediapipe as mp
@@ -21,16 +26,6 @@ except ImportError:
     MEDIAPIPE_AVAILABLE = False
     print("Warning: MediaPipe not available, falling back to Haar Cascades")
 
-# Audio alert imports
-try:
-    if platform.system() == "Windows":
-        import winsound
-    else:
-        # For non-Windows systems, we'll use a simple beep
-        pass
-except ImportError:
-    print("Warning: Audio alert libraries not available")
-
 
 class DrowsinessDetector:
     """
@@ -38,16 +33,25 @@ class DrowsinessDetector:
     Enhanced with MediaPipe for better performance and accuracy
     """
     
-    def __init__(self):
-        # Detection method setup
-        self.use_mediapipe = MEDIAPIPE_AVAILABLE
+    def __init__(self, render_overlay=True, max_num_faces=1, ear_threshold=None, calibrate=False,
+                 landmark_cache=None, profile=None):
+        # Detection method setup (see detector_profiles.DETECTOR_PROFILES);
+        # face mesh profiles fall back to Haar without MediaPipe
+        self.profile = profile or DEFAULT_PROFILE
+        profile_settings = get_profile(self.profile)
+        if profile_settings['backend'] == 'mediapipe' and not MEDIAPIPE_AVAILABLE:
+            self.profile = 'haar'
+            profile_settings = get_profile(self.profile)
+        self.use_mediapipe = profile_settings['backend'] == 'mediapipe'
+        self.refine_landmarks = profile_settings.get('refine_landmarks', False)
+        self.max_num_faces = max_num_faces
         
         if self.use_mediapipe:
             # MediaPipe face mesh setup
             self.mp_face_mesh = mp.solutions.face_mesh
             self.face_mesh = self.mp_face_mesh.FaceMesh(
-                max_num_faces=1,
-                refine_landmarks=True,
+                max_num_faces=max_num_faces,
+                refine_landmarks=self.refine_landmarks,
                 min_detection_confidence=0.5,
                 min_tracking_confidence=0.5
             )
@@ -64,35 +68,109 @@ class DrowsinessDetector:
             # Fallback to OpenCV Haar Cascades
             self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
             self.eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
+            
+            # Face tracking between full detections
+            self.HAAR_REDETECT_INTERVAL = profile_settings.get('haar_redetect_interval', 10)  # Full face detection every nth processed frame
+            self.HAAR_TRACK_MIN_SCORE = 0.6  # Template match score to keep tracking
+            self.HAAR_EYE_PATCH_SIZE = (32, 24)  # Eye patch size (w, h) for openness
+            self.HAAR_DARK_RATIO = 0.5  # Pixels darker than this fraction of the face's median are eye
+            self.HAAR_EXTENT_PERCENTILE = 90  # Column percentile taken as the dark region's height
+            self.HAAR_OPENNESS_SCALE = 1.25  # Maps dark height / eye width to EAR scale
+            
+            # Default eye boxes relative to the face (x, y, w, h), used
+            # until the eye cascade finds both eyes
+            self.HAAR_DEFAULT_EYE_BOXES = [(0.15, 0.25, 0.32, 0.25), (0.53, 0.25, 0.32, 0.25)]
+            
+            self.haar_face_box = None
+            self.haar_face_template = None
+            self.haar_eye_boxes = None
+            self.haar_frames_since_detect = 0
         
         # Eye detection parameters
         self.EAR_THRESHOLD = 0.25  # EAR threshold for drowsiness
+        if ear_threshold is not None:
+            self.EAR_THRESHOLD = ear_threshold  # Personal (calibrated) threshold
         self.CONSECUTIVE_FRAMES = 20  # Frames to consider drowsy
         self.FRAME_SKIP = 2  # Process every nth frame for performance
         
+        # EAR smoothing and blink filtering
+        self.EAR_SMOOTHING_WINDOW = 5  # Median window (processed frames)
+        self.EAR_SMOOTHING_ALPHA = 0.5  # EMA weight of the newest sample
+        self.BLINK_MAX_DURATION = 0.5  # Longer closures are not blinks (seconds)
+        self.ear_filter = EARFilter(self.EAR_SMOOTHING_WINDOW, self.EAR_SMOOTHING_ALPHA)
+        self.blink_detector = BlinkDetector(max_duration=self.BLINK_MAX_DURATION)
+        
+        # Fatigue score from eye closure, yawning (mouth aspect ratio) and
+        # nodding (head pitch); alerts above FATIGUE_ALERT_THRESHOLD, re-arms
+        # below FATIGUE_CLEAR_THRESHOLD
+        self.FATIGUE_WINDOW = 150  # Processed frames (~10 s)
+        self.FATIGUE_ALERT_THRESHOLD = 0.5
+        self.FATIGUE_CLEAR_THRESHOLD = 0.35
+        self.YAWN_MAR_THRESHOLD = 0.6
+        self.NOD_PITCH_DEGREES = 15.0
+        self.fatigue = FatigueEstimator(window=self.FATIGUE_WINDOW,
+                                        yawn_threshold=self.YAWN_MAR_THRESHOLD,
+                                        nod_degrees=self.NOD_PITCH_DEGREES)
+        
         # State variables
         self.ear_values = []
+        self.smoothed_ear = 0.0
+        self.last_timestamp = 0.0
         self.frame_counter = 0
         self.drowsy_counter = 0
         self.alert_triggered = False
+        self.fatigue_alert_triggered = False
         self.is_running = False
         self.frame_count = 0
         
+        # Latest mouth aspect ratio and head pitch (None without face mesh
+        # landmarks)
+        self.last_mar = None
+        self.last_pitch = None
+        
         # Performance optimization
-        self.process_size = (320, 240)  # Smaller size for processing
+        self.process_size = tuple(profile_settings['process_size'])  # Smaller size for processing
         self.display_size = (640, 480)  # Full size for display
         
+        # Overlay rendering (disable when the client draws the overlay
+        # from the metadata stream instead)
+        self.render_overlay = render_overlay
+        
+        # Optional on-disk cache of detection results (for repeated offline
+        # runs over the same recordings), keyed per frame and detector config
+        self.landmark_cache = landmark_cache
+        self.landmark_cache_config = LandmarkCache.config_key(
+            method='mediapipe' if self.use_mediapipe else 'haar',
+            refine_landmarks=self.refine_landmarks,
+            max_num_faces=max_num_faces,
+            version=2,  # 2: entries hold mouth aspect ratio and head pitch
+        )
+        
+        # Latest per-frame metadata (eye points normalised to 0..1)
+        self.last_eye_points = []
+        self.face_detected = False
+        
+        # Per-user threshold calibration at session start
+        self.calibrator = EARCalibrator() if calibrate else None
+        
         # Callback functions
+        self.on_calibration_complete = None
         self.on_drowsiness_detected = None
         self.on_frame_processed = None
         
+        # Alert delivery (None uses the process-wide dispatcher); the key
+        # identifies the session for rate limiting
+        self.alert_dispatcher = None
+        self.alert_key = None
+        self.alert_user_id = None
+    
     def calculate_ear(self, eye_points):
         """
         Calculate Eye Aspect Ratio (EAR) for given eye points
         
         Args:
             eye_points: Array of 6 (x, y) coordinates for eye landmarks
-            
+        
         Returns:
             float: EAR value
         """
@@ -116,121 +194,275 @@ class DrowsinessDetector:
         results = self.face_mesh.process(rgb_frame)
         
         if results.multi_face_landmarks:
-            face_landmarks = results.multi_face_landmarks[0]
-            landmarks = []
-            
-            # Extract landmark coordinates
             h, w = frame.shape[:2]
-            for landmark in face_landmarks.landmark:
-                x = int(landmark.x * w)
-                y = int(landmark.y * h)
-                landmarks.append((x, y))
+            avg_ear, self.last_mar, self.last_pitch, eye_points = face_signals(
+                results.multi_face_landmarks[0], w, h)
             
-            # Extract eye points
-            left_eye_points = [landmarks[i] for i in self.LEFT_EYE_POINTS]
-            right_eye_points = [landmarks[i] for i in self.RIGHT_EYE_POINTS]
-            
-            # Calculate EAR for both eyes
-            left_ear = self.calculate_ear(left_eye_points)
-            right_ear = self.calculate_ear(right_eye_points)
-            avg_ear = (left_ear + right_ear) / 2.0
+            # Keep normalised eye points for the metadata stream
+            self.last_eye_points = [(x / w, y / h) for x, y in eye_points]
             
             # Draw eye landmarks
-            for point in left_eye_points + right_eye_points:
-                cv2.circle(frame, point, 2, (0, 255, 0), -1)
+            if self.render_overlay:
+                for point in eye_points:
+                    cv2.circle(frame, point, 2, (0, 255, 0), -1)
             
             return avg_ear
         
+        self.last_eye_points = []
+        self.last_mar = None
+        self.last_pitch = None
         return None
     
+    def _face_ear(self, face_landmarks, w, h):
+        """
+        Calculate the average EAR for a single MediaPipe face
+        
+        Args:
+            face_landmarks: MediaPipe NormalizedLandmarkList for one face
+            w, h: Frame width and height in pixels
+        
+        Returns:
+            tuple: (average EAR, list of 12 eye points in pixels)
+        """
+        avg_ear, _, _, eye_points = face_signals(face_landmarks, w, h)
+        return avg_ear, eye_points
+    
     def detect_eyes_haar(self, frame):
         """
         Fallback eye detection using Haar Cascades
-        Returns estimated EAR based on eye count
+        Returns an EAR-scale openness estimate from the eye regions
         """
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
-        # Detect faces
-        faces = self.face_cascade.detectMultiScale(gray, 1.2, 4)
+        # Detect the face every few frames and track it in between
+        face_box = self._track_haar_face(gray)
+        if face_box is None:
+            self.last_eye_points = []
+            return None
         
-        eye_count = 0
-        for (x, y, w, h) in faces:
-            # Draw rectangle around face
-            cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
-            
-            # Region of interest for eyes (upper 60% of face)
-            roi_gray = gray[y:y+int(h*0.6), x:x+w]
-            roi_color = frame[y:y+int(h*0.6), x:x+w]
+        # Detect eyes in the cached face region, keeping the last good boxes
+        eye_boxes = self._haar_eye_boxes(gray, face_box, self.haar_eye_boxes)
+        self.haar_eye_boxes = eye_boxes
+        
+        ear, eye_rects = self._haar_eye_openness(gray, face_box, eye_boxes)
+        
+        h, w = frame.shape[:2]
+        self.last_eye_points = [((ex + ew / 2) / w, (ey + eh / 2) / h) for ex, ey, ew, eh in eye_rects]
+        
+        if self.render_overlay:
+            x, y, fw, fh = face_box
+            cv2.rectangle(frame, (x, y), (x+fw, y+fh), (255, 0, 0), 2)
+            for (ex, ey, ew, eh) in eye_rects:
+                cv2.rectangle(frame, (ex, ey), (ex+ew, ey+eh), (0, 255, 0), 2)
+        
+        return ear
+    
+    def _track_haar_face(self, gray):
+        """
+        Locate the face, running the cascade only every HAAR_REDETECT_INTERVAL
+        frames and template matching near the last position otherwise
+        
+        Returns:
+            tuple: Face box (x, y, w, h) or None if no face
+        """
+        self.haar_frames_since_detect += 1
+        face_box = None
+        
+        if self.haar_face_box is not None and self.haar_frames_since_detect < self.HAAR_REDETECT_INTERVAL:
+            face_box = self._match_haar_face(gray, self.haar_face_box)
+        
+        if face_box is None:
+            self.haar_frames_since_detect = 0
+            faces = self.face_cascade.detectMultiScale(gray, 1.2, 4)
             
-            # Detect eyes in the face region
-            eyes = self.eye_cascade.detectMultiScale(roi_gray, 1.1, 3)
-            eye_count = len(eyes)
+            if len(faces) == 0:
+                self.haar_face_box = None
+                self.haar_face_template = None
+                return None
             
-            # Draw rectangles around eyes
-            for (ex, ey, ew, eh) in eyes:
-                cv2.rectangle(roi_color, (ex, ey), (ex+ew, ey+eh), (0, 255, 0), 2)
-        
-        # Estimate EAR based on eye count (rough approximation)
-        if eye_count >= 2:
-            return 0.3  # Eyes open
-        elif eye_count == 1:
-            return 0.2  # Partially closed
-        else:
-            return 0.15  # Eyes closed
+            # Track the largest face
+            face_box = tuple(int(v) for v in max(faces, key=lambda f: f[2] * f[3]))
+        
+        x, y, w, h = face_box
+        self.haar_face_box = face_box
+        self.haar_face_template = gray[y:y+h, x:x+w].copy()
+        return face_box
+    
+    def _match_haar_face(self, gray, face_box):
+        """
+        Find the cached face template in a window around its last position
+        
+        Returns:
+            tuple: Updated face box, or None if tracking was lost
+        """
+        x, y, w, h = face_box
+        margin_x, margin_y = w // 4, h // 4
+        x0, y0 = max(x - margin_x, 0), max(y - margin_y, 0)
+        x1, y1 = min(x + w + margin_x, gray.shape[1]), min(y + h + margin_y, gray.shape[0])
+        
+        search = gray[y0:y1, x0:x1]
+        template = self.haar_face_template
+        if template is None or search.shape[0] < template.shape[0] or search.shape[1] < template.shape[1]:
+            return None
+        
+        result = cv2.matchTemplate(search, template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, location = cv2.minMaxLoc(result)
+        if score < self.HAAR_TRACK_MIN_SCORE:
+            return None
+        
+        return (x0 + location[0], y0 + location[1], w, h)
+    
+    def _haar_eye_boxes(self, gray, face_box, cached_boxes=None):
+        """
+        Detect both eyes in the upper face region
+        
+        Returns:
+            list: Two eye boxes (x, y, w, h) relative to the face size,
+            left to right; the cached or default boxes if detection fails
+        """
+        x, y, w, h = face_box
+        roi_gray = gray[y:y+int(h*0.6), x:x+w]
+        min_eye = max(w // 8, 1)
+        eyes = self.eye_cascade.detectMultiScale(roi_gray, 1.1, 3, minSize=(min_eye, min_eye))
+        
+        if len(eyes) >= 2:
+            # Two largest detections, ordered left to right
+            eyes = sorted(eyes, key=lambda e: e[2] * e[3], reverse=True)[:2]
+            eyes = sorted(eyes, key=lambda e: e[0])
+            return [(ex / w, ey / h, ew / w, eh / h) for ex, ey, ew, eh in eyes]
+        
+        return cached_boxes or self.HAAR_DEFAULT_EYE_BOXES
+    
+    def _haar_eye_openness(self, gray, face_box, eye_boxes):
+        """
+        Estimate eye openness from the vertical extent of the dark region
+        in both eye patches (computed together with NumPy)
+        
+        Pixels are dark relative to the face's median brightness, so the
+        threshold follows the lighting but not the patch's own contrast: an
+        open eye shows a tall dark region (iris and pupil), a closed eye
+        only a thin lash line.
+        
+        Returns:
+            tuple: (EAR-scale openness, eye rectangles in frame pixels)
+        """
+        x, y, w, h = face_box
+        patches = []
+        rects = []
+        
+        for rx, ry, rw, rh in eye_boxes:
+            ex, ey = x + int(rx * w), y + int(ry * h)
+            ew, eh = max(int(rw * w), 1), max(int(rh * h), 1)
+            patch = gray[ey:ey+eh, ex:ex+ew]
+            if patch.size == 0:
+                return None, []
+            patches.append(cv2.resize(patch, self.HAAR_EYE_PATCH_SIZE, interpolation=cv2.INTER_AREA))
+            rects.append((ex, ey, ew, eh))
+        
+        # Dark pixels of each eye: shape (eyes, rows, cols)
+        face_level = float(np.median(gray[y:y+h:4, x:x+w:4]))
+        dark = np.stack(patches) < face_level * self.HAAR_DARK_RATIO
+        
+        # Height of the dark region: dark rows per column, taken at a high
+        # percentile so a few stray columns don't decide it
+        extent = np.percentile(dark.sum(axis=1), self.HAAR_EXTENT_PERCENTILE, axis=1)
+        
+        # Dark height relative to eye width (like EAR's height/width)
+        aspect = np.array([eh / ew for _, _, ew, eh in rects], dtype=np.float32)
+        openness = extent / self.HAAR_EYE_PATCH_SIZE[1] * aspect
+        
+        return float(openness.mean() * self.HAAR_OPENNESS_SCALE), rects
     
     def detect_eyes(self, frame):
         """
         Main eye detection method that uses the best available approach
         """
+        if self.landmark_cache is not None:
+            key = LandmarkCache.frame_key(frame, self.landmark_cache_config)
+            cached = self.landmark_cache.get(key)
+            if cached is not None:
+                ear, self.last_eye_points, self.last_mar, self.last_pitch = cached
+                return ear
+        
         if self.use_mediapipe:
-            return self.detect_eyes_mediapipe(frame)
+            ear = self.detect_eyes_mediapipe(frame)
         else:
-            return self.detect_eyes_haar(frame)
+            ear = self.detect_eyes_haar(frame)
+        
+        if self.landmark_cache is not None:
+            self.landmark_cache.put(key, ear, self.last_eye_points, self.last_mar, self.last_pitch)
+        return ear
     
     def play_alert_sound(self):
         """
         Play alert sound using system capabilities
         """
-        try:
-            if platform.system() == "Windows":
-                # Use Windows system beep
-                winsound.Beep(1000, 500)  # 1000Hz for 500ms
-            else:
-                # For Linux/Mac, try to use system bell
-                os.system('echo -e "\a"')
-        except Exception as e:
-            print(f"Could not play alert sound: {e}")
+        play_beep()
+    
+    def dispatch_alert(self, key=None, user_id=None, **details):
+        """
+        Hand an alert to the dispatcher (non-blocking)
+        
+        Args:
+            key: Rate-limiting key (defaults to alert_key)
+            user_id: Student the alert belongs to (defaults to alert_user_id)
+            **details: Extra alert information
+        """
+        dispatcher = self.alert_dispatcher or get_dispatcher()
+        dispatcher.dispatch(Alert(
+            key or self.alert_key or f"detector:{id(self)}",
+            user_id=user_id if user_id is not None else self.alert_user_id,
+            details=details,
+        ))
     
-    def process_frame(self, frame):
+    def next_frame_is_processed(self):
+        """
+        Count a new frame and say whether FRAME_SKIP keeps it for detection
+        """
+        self.frame_count += 1
+        return self.frame_count % self.FRAME_SKIP == 0
+    
+    def measure_ear(self, frame):
+        """
+        Raw EAR of a full-size frame (None if no face is found)
+        
+        The frame is resized to process_size first (performance
+        optimization). Replay recordings measure frames the same way.
+        """
+        return self.detect_eyes(cv2.resize(frame, self.process_size))
+    
+    def process_frame(self, frame, timestamp=None):
         """
         Process a single frame for drowsiness detection
         
+        Args:
+            frame: BGR frame
+            timestamp: Capture time in seconds (defaults to now)
+        
         Returns:
-            tuple: (processed_frame, ear_value, is_drowsy)
+            tuple: (processed_frame, smoothed ear_value, is_drowsy)
         """
         if frame is None:
             return None, 0.0, False
         
-        self.frame_count += 1
         is_drowsy = False
         ear_value = 0.0
         
         # Skip frames for performance optimization
-        if self.frame_count % self.FRAME_SKIP != 0:
+        if not self.next_frame_is_processed():
             # Return previous EAR value for skipped frames
             if len(self.ear_values) > 0:
-                ear_value = self.ear_values[-1]
+                ear_value = self.smoothed_ear
             
             # Display previous state information
-            self._draw_frame_info(frame, ear_value, is_drowsy)
+            if self.render_overlay:
+                self._draw_frame_info(frame, ear_value, is_drowsy)
             return frame, ear_value, is_drowsy
         
-        # Resize frame for processing (performance optimization)
-        small_frame = cv2.resize(frame, self.process_size)
-        
         # Detect eyes and calculate EAR
-        ear_value = self.detect_eyes(small_frame)
+        ear_value = self.measure_ear(frame)
         
+        self.face_detected = ear_value is not None
         if ear_value is None:
             ear_value = 0.3  # Default value when no face detected
         
@@ -239,34 +471,66 @@ class DrowsinessDetector:
         if len(self.ear_values) > 100:  # Keep last 100 values
             self.ear_values.pop(0)
         
+        # Calibrate the personal threshold before checking for drowsiness
+        if self.calibrator is not None:
+            if self.face_detected and self.calibrator.update(ear_value):
+                self._finish_calibration()
+            
+            ear_value = self.smoothed_ear = self.ear_filter.update(ear_value)
+            if self.render_overlay:
+                self._draw_frame_info(frame, ear_value, is_drowsy)
+            return frame, ear_value, is_drowsy
+        
+        # Blinks are detected on the raw signal, drowsiness on the smoothed one
+        if timestamp is None:
+            timestamp = time.time()
+        self.last_timestamp = timestamp
+        self.blink_detector.update(ear_value, self.EAR_THRESHOLD, timestamp)
+        ear_value = self.smoothed_ear = self.ear_filter.update(ear_value)
+        
         # Check for drowsiness (EAR below threshold)
         if ear_value < self.EAR_THRESHOLD:
             self.frame_counter += 1
-            
-            if self.frame_counter >= self.CONSECUTIVE_FRAMES:
-                if not self.alert_triggered:
-                    is_drowsy = True
-                    self.alert_triggered = True
-                    self.drowsy_counter += 1
-                    
-                    # Play alert sound in separate thread
-                    threading.Thread(target=self.play_alert_sound, daemon=True).start()
-                    
-                    # Trigger callback if set
-                    if self.on_drowsiness_detected:
-                        self.on_drowsiness_detected()
-                
-                # Draw drowsiness warning
-                cv2.putText(frame, "DROWSINESS ALERT!", (10, 30),
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-                cv2.putText(frame, "Wake Up!", (10, 65),
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
         else:
             self.frame_counter = 0
             self.alert_triggered = False
         
+        eyes_alert = self.frame_counter >= self.CONSECUTIVE_FRAMES and not self.alert_triggered
+        if eyes_alert:
+            self.alert_triggered = True
+        
+        # Fused fatigue score; it alerts on its own when eyes close
+        # intermittently, yawns or nods (not again during an eye alert)
+        fatigue = self.fatigue.update(ear_value < self.EAR_THRESHOLD, self.last_mar, self.last_pitch)
+        fatigue_alert = False
+        if fatigue >= self.FATIGUE_ALERT_THRESHOLD:
+            fatigue_alert = not self.fatigue_alert_triggered and not self.alert_triggered
+            self.fatigue_alert_triggered = True
+        elif fatigue < self.FATIGUE_CLEAR_THRESHOLD:
+            self.fatigue_alert_triggered = False
+        
+        if eyes_alert or fatigue_alert:
+            is_drowsy = True
+            self.drowsy_counter += 1
+            
+            # Sound, record and push the alert off the capture thread
+            self.dispatch_alert(ear=round(ear_value, 3), fatigue=round(fatigue, 3),
+                                reason='eyes_closed' if eyes_alert else 'fatigue')
+            
+            # Trigger callback if set
+            if self.on_drowsiness_detected:
+                self.on_drowsiness_detected()
+        
+        # Draw drowsiness warning
+        if self.render_overlay and self._is_drowsy_state():
+            cv2.putText(frame, "DROWSINESS ALERT!", (10, 30),
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+            cv2.putText(frame, "Wake Up!", (10, 65),
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+        
         # Draw frame information
-        self._draw_frame_info(frame, ear_value, is_drowsy)
+        if self.render_overlay:
+            self._draw_frame_info(frame, ear_value, is_drowsy)
         
         # Trigger frame processed callback
         if self.on_frame_processed:
@@ -274,6 +538,44 @@ class DrowsinessDetector:
         
         return frame, ear_value, is_drowsy
     
+    def _is_drowsy_state(self):
+        """Eyes closed for too long, or fatigue above the alert level"""
+        return self.frame_counter >= self.CONSECUTIVE_FRAMES or self.fatigue_alert_triggered
+    
+    def _finish_calibration(self):
+        """
+        Switch to the calibrated personal threshold
+        """
+        threshold = self.calibrator.threshold()
+        self.calibrator = None
+        
+        if threshold is not None:
+            self.EAR_THRESHOLD = threshold
+            if self.on_calibration_complete:
+                self.on_calibration_complete(threshold)
+    
+    def get_frame_metadata(self):
+        """
+        Get compact metadata for the latest processed frame, used by the
+        client-side overlay instead of drawing on the frame server-side
+        
+        Returns:
+            dict: JSON-serialisable detection state
+        """
+        return {
+            'frame': self.frame_count,
+            'ear': round(float(self.smoothed_ear), 4),
+            'threshold': self.EAR_THRESHOLD,
+            'status': 'drowsy' if self._is_drowsy_state() else 'alert',
+            'alerts': self.drowsy_counter,
+            'fatigue': round(self.fatigue.score, 3),
+            'yawning': self.fatigue.yawning,
+            'nodding': self.fatigue.nodding,
+            'face': self.face_detected,
+            'eyes': [[round(x, 4), round(y, 4)] for x, y in self.last_eye_points],
+            'calibrating': round(self.calibrator.progress(), 2) if self.calibrator else None,
+        }
+    
     def _draw_frame_info(self, frame, ear_value, is_drowsy):
         """
         Draw information overlay on the frame
@@ -292,6 +594,17 @@ class DrowsinessDetector:
         cv2.putText(frame, status_text, (frame.shape[1] - 150, 80),
                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
         
+        # Fused fatigue score
+        fatigue_color = (0, 0, 255) if self.fatigue.score >= self.FATIGUE_ALERT_THRESHOLD else (255, 255, 255)
+        cv2.putText(frame, f"Fatigue: {self.fatigue.score:.0%}", (frame.shape[1] - 150, 105),
+                  cv2.FONT_HERSHEY_SIMPLEX, 0.6, fatigue_color, 2)
+        
+        # Calibration progress
+        if self.calibrator is not None:
+            progress = int(self.calibrator.progress() * 100)
+            cv2.putText(frame, f"Calibrating - keep eyes open ({progress}%)", (10, 30),
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        
         # Threshold line visualization
         bar_width = 200
         bar_height = 10
@@ -310,33 +623,24 @@ class DrowsinessDetector:
         threshold_x = int(self.EAR_THRESHOLD / 0.5 * bar_width) + bar_x
         cv2.line(frame, (threshold_x, bar_y - 5), (threshold_x, bar_y + bar_height + 5), (255, 255, 0), 2)
     
-    def start_detection(self, camera_index=0):
+    def start_detection(self, source=0):
         """
         Start real-time drowsiness detection using webcam
+        
+        Args:
+            source: Camera index or any frame source spec accepted by
+                frame_sources.open_source (video file, 'synthetic', URL, ...)
         """
         self.is_running = True
-        cap = cv2.VideoCapture(camera_index)
-        
-        if not cap.isOpened():
-            raise Exception("Could not open camera")
-        
-        # Set camera properties for optimal performance
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.display_size[0])
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.display_size[1])
-        cap.set(cv2.CAP_PROP_FPS, 30)
-        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer to decrease latency
+        frames = open_source(source, size=self.display_size, prefetch=2)
         
         try:
-            while self.is_running:
-                ret, frame = cap.read()
-                if not ret:
+            for timestamp, frame in frames:
+                if not self.is_running:
                     break
                 
-                # Flip frame horizontally for mirror effect
-                frame = cv2.flip(frame, 1)
-                
                 # Process frame
-                processed_frame, ear_value, is_drowsy = self.process_frame(frame)
+                processed_frame, ear_value, is_drowsy = self.process_frame(frame, timestamp)
                 
                 if processed_frame is not None:
                     # Display frame
@@ -345,9 +649,9 @@ class DrowsinessDetector:
                 # Check for exit key
                 if cv2.waitKey(1) & 0xFF == ord('q'):
                     break
-                    
+        
         finally:
-            cap.release()
+            frames.close()
             cv2.destroyAllWindows()
     
     def stop_detection(self):
@@ -356,6 +660,19 @@ class DrowsinessDetector:
         """
         self.is_running = False
     
+    def release(self):
+        """
+        Free the face detector and flush the landmark cache
+        
+        The detector must not process frames afterwards.
+        """
+        self.is_running = False
+        if self.use_mediapipe and self.face_mesh is not None:
+            self.face_mesh.close()
+            self.face_mesh = None
+        if self.landmark_cache is not None:
+            self.landmark_cache.flush()
+    
     def reset_counters(self):
         """
         Reset all counters for new session
@@ -364,7 +681,22 @@ class DrowsinessDetector:
         self.drowsy_counter = 0
         self.alert_triggered = False
         self.ear_values = []
+        self.smoothed_ear = 0.0
+        self.last_timestamp = 0.0
+        self.ear_filter.reset()
+        self.blink_detector.reset()
+        self.fatigue.reset()
+        self.fatigue_alert_triggered = False
+        self.last_mar = None
+        self.last_pitch = None
         self.frame_count = 0
+        self.last_eye_points = []
+        self.face_detected = False
+        if not self.use_mediapipe:
+            self.haar_face_box = None
+            self.haar_face_template = None
+            self.haar_eye_boxes = None
+            self.haar_frames_since_detect = 0
     
     def get_statistics(self):
         """
@@ -375,11 +707,20 @@ class DrowsinessDetector:
             'average_ear': np.mean(self.ear_values) if self.ear_values else 0.0,
             'min_ear': np.min(self.ear_values) if self.ear_values else 0.0,
             'max_ear': np.max(self.ear_values) if self.ear_values else 0.0,
-            'current_ear': self.ear_values[-1] if self.ear_values else 0.0
+            'current_ear': self.ear_values[-1] if self.ear_values else 0.0,
+            'smoothed_ear': self.smoothed_ear,
+            'blink_count': self.blink_detector.blink_count,
+            'blink_rate': self.blink_detector.blink_rate(self.last_timestamp),
+            'mean_blink_duration': self.blink_detector.mean_duration(),
+            'fatigue_score': self.fatigue.score,
+            'fatigue_levels': self.fatigue.levels(),  # eyes (PERCLOS), yawn, nod
+            'mouth_aspect_ratio': self.last_mar,
+            'head_pitch': self.last_pitch,
         }
 
 
-# Test function for standalone usage
+# Test function for standalone usage (run from the project root as
+# python -m drowsiness_app.drowsiness_detector; the module uses package imports)
 if __name__ == "__main__":
     detector = DrowsinessDetector()
     
@@ -0,0 +1,301 @@
+"""
+Bulk Student Enrollment
+Student Eye Drowsiness Detection System
+This module imports students (a User plus a UserProfile each) from CSV.
+Rows are validated in memory and checked for duplicates against the
+database with a few set-based queries instead of one query per row, the
+passwords (the dominant cost) are hashed in a process pool, and the
+accounts are inserted with bulk_create, one transaction per batch.
+"""
+
+import csv
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .models import UserProfile
+
+
+REQUIRED_COLUMNS = ('username', 'email', 'password')
+OPTIONAL_COLUMNS = ('enrollment_no', 'batch_year', 'first_name', 'last_name')
+
+# Column -> maximum length (the model field sizes)
+FIELD_LIMITS = {'username': 150, 'email': 254, 'enrollment_no': 20, 'batch_year': 20,
+                'first_name': 150, 'last_name': 150}
+
+IMPORT_BATCH_SIZE = 500  # Rows inserted per transaction
+LOOKUP_CHUNK_SIZE = 500  # Values per IN (...) duplicate lookup
+HASH_CHUNK_SIZE = 16  # Passwords hashed per pool task
+
+_username_validator = UnicodeUsernameValidator()
+
+
+def read_rows(csv_file):
+    """
+    Rows of a student CSV file
+    
+    Header names are matched case-insensitively; unknown columns are ignored.
+    
+    Args:
+        csv_file: Text file object (opened with newline='')
+    
+    Returns:
+        list: (line number, row dict) pairs
+    
+    Raises:
+        ValueError: If a required column is missing
+    """
+    reader = csv.DictReader(csv_file)
+    columns = [(name or '').strip().lower() for name in reader.fieldnames or []]
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(missing)}")
+    reader.fieldnames = columns
+    
+    rows = []
+    for row in reader:
+        rows.append((reader.line_num, {
+            name: (row.get(name) or '').strip() for name in REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+        }))
+    return rows
+
+
+def _check_row(row):
+    """
+    Field-level problems of one row (no database access)
+    
+    Returns:
+        str: Error message, or None if the row is valid
+    """
+    for name in REQUIRED_COLUMNS:
+        if not row[name]:
+            return f"{name} is required"
+    try:
+        _username_validator(row['username'])
+        validate_email(row['email'])
+    except ValidationError as e:
+        return ' '.join(e.messages)
+    
+    for name, limit in FIELD_LIMITS.items():
+        if len(row[name]) > limit:
+            return f"{name} is longer than {limit} characters"
+    return None
+
+
+def _existing_values(queryset, field, values):
+    """
+    Subset of values already stored in a field, in chunked IN (...) queries
+    """
+    values = list(values)
+    existing = set()
+    for i in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        chunk = values[i:i + LOOKUP_CHUNK_SIZE]
+        existing.update(queryset.filter(**{f'{field}__in': chunk}).values_list(field, flat=True))
+    return existing
+
+
+def validate_rows(rows):
+    """
+    Split rows into valid ones and per-row errors
+    
+    Duplicates are checked within the file and against existing usernames,
+    emails and enrollment numbers (three set-based lookups in total).
+    
+    Args:
+        rows: (line number, row dict) pairs from read_rows
+    
+    Returns:
+        tuple: (valid rows, list of error dicts with line, username, error)
+    """
+    valid = []
+    errors = []
+    seen = {'username': set(), 'email': set(), 'enrollment_no': set()}
+    
+    for line, row in rows:
+        row['username'] = User.normalize_username(row['username'])
+        row['email'] = User.objects.normalize_email(row['email'])
+        error = _check_row(row)
+        if error is None:
+            for name in seen:
+                if row[name] and row[name] in seen[name]:
+                    error = f"duplicate {name} '{row[name]}' in file"
+                    break
+        if error is not None:
+            errors.append({'line': line, 'username': row['username'], 'error': error})
+            continue
+        for name in seen:
+            if row[name]:
+                seen[name].add(row[name])
+        valid.append((line, row))
+    
+    existing = {
+        'username': _existing_values(User.objects, 'username', seen['username']),
+        'email': _existing_values(User.objects, 'email', seen['email']),
+        'enrollment_no': _existing_values(UserProfile.objects, 'enrollment_no', seen['enrollment_no']),
+    }
+    checked = []
+    for line, row in valid:
+        taken = next((name for name in existing if row[name] and row[name] in existing[name]), None)
+        if taken:
+            errors.append({'line': line, 'username': row['username'],
+                           'error': f"{taken} '{row[taken]}' already registered"})
+        else:
+            checked.append((line, row))
+    
+    errors.sort(key=lambda error: error['line'])
+    return checked, errors
+
+
+def _hash_chunk(passwords):
+    """
+    Hash a list of passwords (runs in a pool worker)
+    """
+    return [make_password(password) for password in passwords]
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Hash passwords with the configured hasher, in parallel
+    
+    Workers are spawned rather than forked, as the server process may be
+    running camera threads; each one sets Django up before hashing.
+    
+    Args:
+        passwords: Plain-text passwords
+        workers: Worker processes (default: CPU count; 1 hashes inline)
+    
+    Returns:
+        list: Hashes in the same order
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(passwords) <= HASH_CHUNK_SIZE:
+        return _hash_chunk(passwords)
+    
+    chunks = [passwords[i:i + HASH_CHUNK_SIZE] for i in range(0, len(passwords), HASH_CHUNK_SIZE)]
+    workers = min(workers, len(chunks))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=django.setup) as executor:
+        return [hashed for chunk in executor.map(_hash_chunk, chunks) for hashed in chunk]
+
+
+def _build_user(row, password_hash):
+    """Unsaved User for a row (first name defaults as in registration)"""
+    return User(
+        username=row['username'],
+        email=row['email'],
+        password=password_hash,
+        first_name=row['first_name'] or row['username'].title(),
+        last_name=row['last_name'],
+    )
+
+
+def _build_profile(user, row):
+    """Unsaved UserProfile for a row"""
+    return UserProfile(
+        user=user,
+        enrollment_no=row['enrollment_no'] or None,
+        batch_year=row['batch_year'] or None,
+    )
+
+
+def _insert_batch(batch):
+    """
+    Insert one batch of (line, row, hash) in a single transaction
+    
+    Raises:
+        IntegrityError: If a row conflicts (e.g. registered meanwhile)
+    """
+    with transaction.atomic():
+        users = User.objects.bulk_create([_build_user(row, password_hash) for _, row, password_hash in batch])
+        if any(user.pk is None for user in users):
+            # Backends that don't return primary keys from bulk inserts (MySQL)
+            ids = dict(User.objects.filter(username__in=[user.username for user in users])
+                       .values_list('username', 'id'))
+            for user in users:
+                user.pk = ids[user.username]
+        UserProfile.objects.bulk_create([_build_profile(user, row) for user, (_, row, _) in zip(users, batch)])
+
+
+def _insert_rows(batch, errors):
+    """
+    Insert a batch row by row, recording the rows that fail
+    
+    Returns:
+        int: Rows inserted
+    """
+    created = 0
+    for line, row, password_hash in batch:
+        try:
+            with transaction.atomic():
+                user = _build_user(row, password_hash)
+                user.save()
+                _build_profile(user, row).save()
+            created += 1
+        except IntegrityError as e:
+            errors.append({'line': line, 'username': row['username'], 'error': f"not saved: {e}"})
+    return created
+
+
+def import_students(rows, workers=None, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Create students from CSV rows
+    
+    Each batch is inserted in one transaction; if a batch hits a conflict
+    (an account registered since validation), it is retried row by row so
+    only the conflicting rows are reported.
+    
+    Args:
+        rows: (line number, row dict) pairs from read_rows
+        workers: Password hashing processes (default: CPU count)
+        batch_size: Rows per transaction
+        dry_run: Validate only; nothing is hashed or saved
+    
+    Returns:
+        dict: Row counts, per-row errors, per-phase seconds and throughput
+    """
+    start = time.perf_counter()
+    valid, errors = validate_rows(rows)
+    validated = time.perf_counter()
+    
+    created = 0
+    hashed = inserted = validated
+    if valid and not dry_run:
+        hashes = hash_passwords([row['password'] for _, row in valid], workers=workers)
+        hashed = time.perf_counter()
+        
+        pending = [(line, row, password_hash) for (line, row), password_hash in zip(valid, hashes)]
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i + batch_size]
+            try:
+                _insert_batch(batch)
+                created += len(batch)
+            except IntegrityError:
+                created += _insert_rows(batch, errors)
+        inserted = time.perf_counter()
+        errors.sort(key=lambda error: error['line'])
+    
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': len(rows),
+        'valid': len(valid),
+        'created': created,
+        'failed': len(errors),
+        'dry_run': dry_run,
+        'errors': errors,
+        'seconds': {
+            'validate': round(validated - start, 3),
+            'hash': round(hashed - validated, 3),
+            'insert': round(inserted - hashed, 3),
+            'total': round(elapsed, 3),
+        },
+        'rows_per_second': round(created / elapsed, 1) if created and elapsed else 0.0,
+    }
@@ -0,0 +1,171 @@
+"""
+Bulk Data Export
+Student Eye Drowsiness Detection System
+This module streams session and alert data as CSV or NDJSON. Rows are read
+with server-side iteration in fixed-size chunks and written one at a time,
+so memory use stays constant however much data is exported.
+"""
+
+import csv
+import json
+
+from django.utils.dateparse import parse_date
+
+from .models import SessionLog
+
+
+EXPORT_KINDS = ('sessions', 'alerts')
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_CHUNK_SIZE = 2000
+
+SESSION_FIELDS = ['session_id', 'username', 'enrollment_no', 'batch_year',
+                  'session_start', 'session_end', 'duration_seconds', 'alert_count']
+ALERT_FIELDS = ['session_id', 'username', 'enrollment_no', 'batch_year', 'alert_time']
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def parse_filter_date(value, label='date'):
+    """
+    Parse an optional YYYY-MM-DD date filter
+    
+    Args:
+        value: Date string (empty for no filter)
+        label: Name of the filter, for the error message
+    
+    Returns:
+        date: Parsed date, or None if the value is empty
+    
+    Raises:
+        ValueError: If the value isn't a valid date (e.g. 2024-02-30)
+    """
+    if not value:
+        return None
+    try:
+        date = parse_date(value)
+    except ValueError:
+        date = None  # Well-formed but not a real date
+    if date is None:
+        raise ValueError(f"Invalid {label} '{value}' (expected YYYY-MM-DD).")
+    return date
+
+
+class _Echo:
+    """File-like object that returns what is written (for csv.writer)"""
+    
+    def write(self, value):
+        return value
+
+
+def export_queryset(username=None, batch_year=None, start_date=None, end_date=None):
+    """
+    Sessions matching the export filters
+    
+    Args:
+        username: Only this student's sessions
+        batch_year: Only sessions of students in this batch
+        start_date, end_date: Inclusive range on the session start date
+    """
+    sessions = SessionLog.objects.all()
+    if username:
+        sessions = sessions.filter(user__username=username)
+    if batch_year:
+        sessions = sessions.filter(user__userprofile__batch_year=batch_year)
+    if start_date:
+        sessions = sessions.filter(session_start__date__gte=start_date)
+    if end_date:
+        sessions = sessions.filter(session_start__date__lte=end_date)
+    return sessions.order_by('pk')
+
+
+def iter_session_rows(sessions):
+    """
+    Yield one dict per session
+    """
+    rows = sessions.values_list(
+        'id', 'user__username', 'user__userprofile__enrollment_no', 'user__userprofile__batch_year',
+        'session_start', 'session_end', 'session_duration', 'alert_count',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    
+    for session_id, username, enrollment_no, batch_year, start, end, duration, alert_count in rows:
+        yield {
+            'session_id': session_id,
+            'username': username,
+            'enrollment_no': enrollment_no or '',
+            'batch_year': batch_year or '',
+            'session_start': start.isoformat(),
+            'session_end': end.isoformat() if end else '',
+            'duration_seconds': int(duration.total_seconds()) if duration else '',
+            'alert_count': alert_count,
+        }
+
+
+def iter_alert_rows(sessions):
+    """
+    Yield one dict per drowsiness alert
+    """
+    rows = sessions.filter(alert_count__gt=0).values_list(
+        'id', 'user__username', 'user__userprofile__enrollment_no', 'user__userprofile__batch_year',
+        'drowsy_timestamps',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    
+    for session_id, username, enrollment_no, batch_year, drowsy_timestamps in rows:
+        try:
+            timestamps = json.loads(drowsy_timestamps)
+        except (json.JSONDecodeError, TypeError):
+            timestamps = []
+        
+        for timestamp in timestamps:
+            yield {
+                'session_id': session_id,
+                'username': username,
+                'enrollment_no': enrollment_no or '',
+                'batch_year': batch_year or '',
+                'alert_time': timestamp,
+            }
+
+
+def iter_csv(rows, fields):
+    """
+    Encode rows as CSV lines, header first
+    """
+    writer = csv.DictWriter(_Echo(), fieldnames=fields)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows):
+    """
+    Encode rows as newline-delimited JSON
+    """
+    for row in rows:
+        yield json.dumps(row, separators=(',', ':')) + '\n'
+
+
+def export_stream(kind='sessions', fmt='csv', **filters):
+    """
+    Stream an export as text chunks
+    
+    Args:
+        kind: 'sessions' or 'alerts'
+        fmt: 'csv' or 'ndjson'
+        **filters: See export_queryset
+    """
+    if kind not in EXPORT_KINDS:
+        raise ValueError(f"Unknown export kind: {kind}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    
+    sessions = export_queryset(**filters)
+    if kind == 'sessions':
+        rows, fields = iter_session_rows(sessions), SESSION_FIELDS
+    else:
+        rows, fields = iter_alert_rows(sessions), ALERT_FIELDS
+    
+    if fmt == 'csv':
+        return iter_csv(rows, fields)
+    return iter_ndjson(rows)
@@ -0,0 +1,78 @@
+"""
+Face Landmark Metrics
+Student Eye Drowsiness Detection System
+This module derives the drowsiness signals from one MediaPipe face mesh
+result: eye aspect ratio (EAR) for both eyes, mouth aspect ratio (MAR, for
+yawning) and head pitch (for nodding). The landmarks are converted to a
+single array once and every ratio is computed in one vectorized step, so
+the extra signals cost no extra inference.
+"""
+
+import numpy as np
+
+
+# Six points per contour: outer corner, two upper, inner corner, two lower
+# (same layout as the EAR formula's p1..p6)
+LEFT_EYE_POINTS = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE_POINTS = [362, 385, 387, 263, 373, 380]
+MOUTH_POINTS = [61, 81, 311, 291, 402, 178]  # Mouth corners and inner lips
+
+# Vertical face axis for head pitch
+FOREHEAD_POINT = 10
+CHIN_POINT = 152
+
+ASPECT_RATIO_POINTS = np.array([LEFT_EYE_POINTS, RIGHT_EYE_POINTS, MOUTH_POINTS])
+
+
+def landmark_array(face_landmarks, w, h):
+    """
+    MediaPipe landmarks as an (N, 3) array in pixels
+    
+    z (depth, relative to the head centre) is scaled by the width, as
+    MediaPipe uses roughly the same scale for x and z.
+    """
+    points = np.array([(lm.x, lm.y, lm.z) for lm in face_landmarks.landmark], dtype=np.float64)
+    return points * (w, h, w)
+
+
+def aspect_ratios(points, contours=ASPECT_RATIO_POINTS):
+    """
+    Aspect ratio (|p2-p6| + |p3-p5|) / (2 |p1-p4|) of several contours at once
+    
+    Args:
+        points: (N, 2+) landmark array
+        contours: (K, 6) landmark indices
+    
+    Returns:
+        numpy array: K aspect ratios
+    """
+    p = points[contours, :2]  # (K, 6, 2)
+    vertical = np.linalg.norm(p[:, [1, 2]] - p[:, [5, 4]], axis=2).sum(axis=1)
+    horizontal = np.linalg.norm(p[:, 0] - p[:, 3], axis=1)
+    return vertical / (2.0 * np.maximum(horizontal, 1e-6))
+
+
+def head_pitch(points):
+    """
+    Head pitch in degrees from the forehead-to-chin axis
+    
+    Positive when the head tips forward (chin moves away from the camera,
+    forehead towards it), as in a nod.
+    """
+    forehead = points[FOREHEAD_POINT]
+    chin = points[CHIN_POINT]
+    return float(np.degrees(np.arctan2(chin[2] - forehead[2], chin[1] - forehead[1])))
+
+
+def face_signals(face_landmarks, w, h):
+    """
+    All per-face signals from one landmark pass
+    
+    Returns:
+        tuple: (average EAR, MAR, head pitch in degrees,
+        list of 12 eye points in pixels)
+    """
+    points = landmark_array(face_landmarks, w, h)
+    left_ear, right_ear, mar = aspect_ratios(points)
+    eye_points = [(int(x), int(y)) for x, y in points[LEFT_EYE_POINTS + RIGHT_EYE_POINTS, :2]]
+    return float((left_ear + right_ear) / 2.0), float(mar), head_pitch(points), eye_points
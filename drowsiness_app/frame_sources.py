@@ -0,0 +1,466 @@
+"""
+Frame Sources
+Student Eye Drowsiness Detection System
+This module provides the video inputs for detection: local cameras, video
+files, image directories, a synthetic generator and network streams. Every
+source is an iterator of (timestamp, frame) pairs and can prefetch frames
+on a background thread so capture overlaps with detection.
+"""
+
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+from django.conf import settings
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+NETWORK_SCHEMES = ('rtsp://', 'rtmp://', 'http://', 'https://', 'udp://', 'tcp://')
+
+
+class FrameSourceError(Exception):
+    """A frame source could not be opened"""
+
+
+class FrameSource:
+    """
+    Base class: iterate to get (timestamp, frame) pairs
+    
+    Subclasses implement _open, _read and _close. Live sources stamp frames
+    with the capture time; recorded sources use media time (seconds from
+    the first frame), so replays are deterministic at any speed.
+    """
+    
+    live = False
+    
+    def __init__(self, size=None, mirror=False, prefetch=0):
+        """
+        Args:
+            size: (width, height) to resize frames to, or None
+            mirror: Flip frames horizontally
+            prefetch: Frames to read ahead on a background thread (0 = off)
+        """
+        self.size = size
+        self.mirror = mirror
+        self.prefetch = prefetch
+        self.frames_read = 0
+        self._opened = False
+    
+    def _open(self):
+        raise NotImplementedError
+    
+    def _read(self):
+        """
+        Returns:
+            tuple: (timestamp, frame), or None at the end of the source
+        """
+        raise NotImplementedError
+    
+    def _close(self):
+        pass
+    
+    def open(self):
+        """Open the underlying device or file"""
+        if not self._opened:
+            self._open()
+            self._opened = True
+        return self
+    
+    def close(self):
+        """Release the underlying device or file"""
+        if self._opened:
+            self._opened = False
+            self._close()
+    
+    def read(self):
+        """
+        Read the next frame, resized and mirrored as configured
+        
+        Returns:
+            tuple: (timestamp, frame), or None at the end of the source
+        """
+        item = self._read()
+        if item is None:
+            return None
+        
+        timestamp, frame = item
+        if self.size is not None and (frame.shape[1], frame.shape[0]) != tuple(self.size):
+            frame = cv2.resize(frame, tuple(self.size))
+        if self.mirror:
+            frame = cv2.flip(frame, 1)
+        
+        self.frames_read += 1
+        return timestamp, frame
+    
+    def __enter__(self):
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __iter__(self):
+        self.open()
+        if self.prefetch > 0:
+            return self._iter_prefetched()
+        return self._iter_direct()
+    
+    def _iter_direct(self):
+        try:
+            while True:
+                item = self.read()
+                if item is None:
+                    return
+                yield item
+        finally:
+            self.close()
+    
+    def _iter_prefetched(self):
+        """
+        Read frames on a background thread into a bounded queue
+        
+        Live sources drop the oldest queued frame when the consumer falls
+        behind (latency matters more than completeness); recorded sources
+        block instead, so no frames are lost.
+        """
+        frames = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        end = object()
+        
+        def reader():
+            try:
+                while not stop.is_set():
+                    item = self.read()
+                    if item is None:
+                        break
+                    while not stop.is_set():
+                        try:
+                            frames.put(item, timeout=0.1)
+                            break
+                        except queue.Full:
+                            if self.live:
+                                try:
+                                    frames.get_nowait()
+                                except queue.Empty:
+                                    pass
+            finally:
+                while True:
+                    try:
+                        frames.put(end, timeout=0.1)
+                        break
+                    except queue.Full:
+                        if stop.is_set():
+                            break
+        
+        thread = threading.Thread(target=reader, daemon=True, name='sedds-frame-prefetch')
+        thread.start()
+        
+        try:
+            while True:
+                item = frames.get()
+                if item is end:
+                    return
+                yield item
+        finally:
+            stop.set()
+            # Unblock the reader if it is waiting on a full queue
+            try:
+                while True:
+                    frames.get_nowait()
+            except queue.Empty:
+                pass
+            thread.join(timeout=2.0)
+            self.close()
+
+
+class _CaptureSource(FrameSource):
+    """
+    Shared cv2.VideoCapture handling
+    """
+    
+    def __init__(self, target, **kwargs):
+        super().__init__(**kwargs)
+        self.target = target
+        self.cap = None
+    
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.target)
+        if not self.cap.isOpened():
+            self.cap.release()
+            self.cap = None
+            raise FrameSourceError(f"Could not open video source: {self.target}")
+        self._configure()
+    
+    def _configure(self):
+        pass
+    
+    def _grab(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+    
+    def _close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class CameraSource(_CaptureSource):
+    """
+    Local camera (mirrored by default, like a webcam preview)
+    """
+    
+    live = True
+    
+    def __init__(self, index=0, size=(640, 480), fps=30, buffer_size=1, mirror=True, prefetch=0):
+        super().__init__(int(index), size=size, mirror=mirror, prefetch=prefetch)
+        self.fps = fps
+        self.buffer_size = buffer_size
+    
+    def _configure(self):
+        # Ask the driver for the target size so frames rarely need resizing
+        if self.size is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.size[1])
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)  # Reduce buffer to decrease latency
+    
+    def _read(self):
+        frame = self._grab()
+        if frame is None:
+            return None
+        return time.time(), frame
+
+
+class NetworkSource(_CaptureSource):
+    """
+    Network stream (RTSP, HTTP MJPEG, ...) with reconnection
+    """
+    
+    live = True
+    
+    def __init__(self, url, reconnect_attempts=5, reconnect_delay=1.0, **kwargs):
+        super().__init__(url, **kwargs)
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_delay = reconnect_delay
+    
+    def _configure(self):
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    
+    def _read(self):
+        frame = self._grab()
+        attempts = 0
+        while frame is None and attempts < self.reconnect_attempts:
+            attempts += 1
+            print(f"Warning: Lost network stream {self.target}, reconnecting ({attempts}/{self.reconnect_attempts})")
+            self._close()
+            time.sleep(self.reconnect_delay)
+            try:
+                self._open()
+            except FrameSourceError:
+                continue
+            frame = self._grab()
+        
+        if frame is None:
+            return None
+        return time.time(), frame
+
+
+class _PacedSource(FrameSource):
+    """
+    Recorded or generated frames stamped with media time
+    
+    With realtime=True reads are paced to the frame rate (as a camera
+    would deliver them); otherwise frames are returned as fast as they can
+    be produced.
+    """
+    
+    def __init__(self, fps=30, realtime=False, loop=False, **kwargs):
+        super().__init__(**kwargs)
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.index = 0
+        self._started = None
+    
+    def _pace(self):
+        if not self.realtime:
+            return
+        if self._started is None:
+            self._started = time.monotonic()
+        delay = self._started + self.index / self.fps - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    
+    def _next_frame(self):
+        """Next raw frame, or None at the end"""
+        raise NotImplementedError
+    
+    def _rewind(self):
+        """Restart from the first frame (for loop=True)"""
+        raise NotImplementedError
+    
+    def _read(self):
+        frame = self._next_frame()
+        if frame is None and self.loop and self.index > 0:
+            self._rewind()
+            frame = self._next_frame()
+        if frame is None:
+            return None
+        
+        self._pace()
+        timestamp = self.index / self.fps
+        self.index += 1
+        return timestamp, frame
+
+
+class VideoFileSource(_PacedSource):
+    """
+    Recorded video file
+    """
+    
+    def __init__(self, path, fps=None, **kwargs):
+        super().__init__(fps=fps or 30, **kwargs)
+        self.path = str(path)
+        self._use_file_fps = fps is None
+        self.cap = None
+    
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            self.cap.release()
+            self.cap = None
+            raise FrameSourceError(f"Could not open video file: {self.path}")
+        if self._use_file_fps:
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or self.fps
+    
+    def _next_frame(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+    
+    def _rewind(self):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    
+    def _close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageDirectorySource(_PacedSource):
+    """
+    Directory of still images, read in filename order
+    """
+    
+    def __init__(self, directory, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = str(directory)
+        self.paths = []
+        self._position = 0
+    
+    def _open(self):
+        if not os.path.isdir(self.directory):
+            raise FrameSourceError(f"Not a directory: {self.directory}")
+        self.paths = sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.paths:
+            raise FrameSourceError(f"No images in {self.directory}")
+        self._position = 0
+    
+    def _next_frame(self):
+        while self._position < len(self.paths):
+            path = self.paths[self._position]
+            self._position += 1
+            frame = cv2.imread(path)
+            if frame is not None:
+                return frame
+            print(f"Warning: Could not read image {path}, skipping")
+        return None
+    
+    def _rewind(self):
+        self._position = 0
+
+
+class SyntheticSource(_PacedSource):
+    """
+    Generated face that blinks periodically (no camera needed)
+    """
+    
+    def __init__(self, width=640, height=480, blink_every=4.0, blink_duration=0.3,
+                 max_frames=None, **kwargs):
+        super().__init__(**kwargs)
+        self.width = width
+        self.height = height
+        self.blink_every = blink_every
+        self.blink_duration = blink_duration
+        self.max_frames = max_frames
+        self._open_frame = None
+        self._closed_frame = None
+    
+    def _draw_face(self, eyes_open):
+        frame = np.full((self.height, self.width, 3), 90, dtype=np.uint8)
+        cx, cy = self.width // 2, self.height // 2
+        face_w, face_h = self.width // 6, self.height // 3
+        cv2.ellipse(frame, (cx, cy), (face_w, face_h), 0, 0, 360, (150, 170, 200), -1)
+        
+        eye_w, eye_h = face_w // 4, (face_h // 10 if eyes_open else 2)
+        for dx in (-face_w // 2, face_w // 2):
+            center = (cx + dx, cy - face_h // 4)
+            cv2.ellipse(frame, center, (eye_w, eye_h + 4), 0, 0, 360, (230, 230, 230), -1)
+            cv2.ellipse(frame, center, (eye_w // 2, eye_h), 0, 0, 360, (30, 30, 30), -1)
+        
+        cv2.ellipse(frame, (cx, cy + face_h // 2), (face_w // 3, face_h // 12), 0, 0, 180, (60, 60, 120), 3)
+        return frame
+    
+    def _open(self):
+        self._open_frame = self._draw_face(eyes_open=True)
+        self._closed_frame = self._draw_face(eyes_open=False)
+    
+    def _next_frame(self):
+        if self.max_frames is not None and self.index >= self.max_frames:
+            return None
+        t = (self.index / self.fps) % self.blink_every
+        frame = self._closed_frame if t < self.blink_duration else self._open_frame
+        # Callers draw on frames, so hand out a copy
+        return frame.copy()
+    
+    def _rewind(self):
+        pass
+
+
+def open_source(spec=None, size=(640, 480), realtime=True, loop=False, prefetch=0, **kwargs):
+    """
+    Create a frame source from a spec
+    
+    Args:
+        spec: Camera index, 'synthetic', a network URL, an image directory
+            or a video file path. Defaults to the SEDDS_VIDEO_SOURCE setting.
+        size: Output frame size (width, height), or None to keep it
+        realtime: Pace recorded/synthetic sources to their frame rate
+        loop: Restart recorded sources at the end
+        prefetch: Frames to read ahead on a background thread
+        **kwargs: Passed to the source class
+    
+    Returns:
+        FrameSource (not yet opened)
+    """
+    if spec is None:
+        spec = getattr(settings, 'SEDDS_VIDEO_SOURCE', 0)
+    
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec), size=size, prefetch=prefetch, **kwargs)
+    
+    spec = str(spec)
+    if spec == 'synthetic':
+        width, height = size or (640, 480)
+        return SyntheticSource(width=width, height=height, realtime=realtime, loop=loop,
+                               prefetch=prefetch, **kwargs)
+    if spec.lower().startswith(NETWORK_SCHEMES):
+        return NetworkSource(spec, size=size, prefetch=prefetch, **kwargs)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, size=size, realtime=realtime, loop=loop,
+                                    prefetch=prefetch, **kwargs)
+    return VideoFileSource(spec, size=size, realtime=realtime, loop=loop, prefetch=prefetch, **kwargs)
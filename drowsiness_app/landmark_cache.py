@@ -0,0 +1,169 @@
+"""
+Landmark Result Cache
+Student Eye Drowsiness Detection System
+This module caches per-frame eye detection results (EAR, normalised eye
+points, mouth aspect ratio and head pitch) on disk, keyed by a BLAKE2b
+hash of the frame pixels and the detector configuration. Entries live in
+a fixed-size memory-mapped array, so lookups don't load the cache into
+memory, and the least recently used entry is overwritten when the cache
+is full. Repeated analyses of the same recordings then skip face
+detection entirely.
+"""
+
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+
+MAX_EYE_POINTS = 12  # MediaPipe gives 6 points per eye
+
+ENTRY_DTYPE = np.dtype([
+    ('key', 'u1', (16,)),  # Raw digest (a bytes field would drop trailing NULs)
+    ('ear', '<f8'),  # NaN when no face was found
+    ('mar', '<f8'),  # Mouth aspect ratio, NaN without face mesh landmarks
+    ('pitch', '<f8'),  # Head pitch in degrees, NaN without face mesh landmarks
+    ('point_count', '<u1'),
+    ('points', '<f4', (MAX_EYE_POINTS, 2)),
+    ('last_used', '<u8'),  # Access tick for LRU eviction (0 = empty slot)
+])
+
+
+class LandmarkCache:
+    """
+    On-disk LRU cache of eye detection results
+    
+    Not safe for several processes writing the same directory; threads
+    within one process may share an instance.
+    """
+    
+    FILENAME = 'landmarks.npy'
+    
+    def __init__(self, directory, max_entries=100000):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            max_entries: Capacity of a new cache; an existing cache keeps
+                the capacity it was created with
+        """
+        self.directory = str(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, self.FILENAME)
+        
+        self.entries = None
+        if os.path.exists(path):
+            self.entries = np.load(path, mmap_mode='r+')
+            if self.entries.dtype != ENTRY_DTYPE:
+                print(f"Warning: Landmark cache {path} has an older format, starting an empty cache")
+                max_entries = len(self.entries)
+                self.entries = None
+        if self.entries is None:
+            self.entries = np.lib.format.open_memmap(path, mode='w+', dtype=ENTRY_DTYPE, shape=(max_entries,))
+        
+        # Key -> slot index for the used slots
+        used = np.flatnonzero(self.entries['last_used'])
+        self.index = {self.entries['key'][slot].tobytes(): int(slot) for slot in used}
+        self.tick = int(self.entries['last_used'].max()) if len(self.entries) else 0
+        
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def config_key(**config):
+        """
+        Stable byte string for a detector configuration
+        """
+        return repr(sorted(config.items())).encode()
+    
+    @staticmethod
+    def frame_key(frame, config=b''):
+        """
+        BLAKE2b digest of a frame's pixels, shape and detector config
+        """
+        hasher = hashlib.blake2b(config, digest_size=16)
+        hasher.update(repr((frame.shape, frame.dtype.str)).encode())
+        hasher.update(np.ascontiguousarray(frame).data)
+        return hasher.digest()
+    
+    def get(self, key):
+        """
+        Look up a result
+        
+        Returns:
+            tuple: (ear, [(x, y), ...], mar, pitch), with None for missing
+            values, or None on a miss
+        """
+        with self._lock:
+            slot = self.index.get(key)
+            if slot is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self.tick += 1
+            self.entries['last_used'][slot] = self.tick
+            # Copied under the lock: the slot is a view of the mapped file,
+            # and a concurrent put() may evict and overwrite it
+            entry = self.entries[slot].copy()
+        
+        ear, mar, pitch = (None if np.isnan(entry[name]) else float(entry[name])
+                           for name in ('ear', 'mar', 'pitch'))
+        points = [tuple(point) for point in entry['points'][:entry['point_count']].tolist()]
+        return ear, points, mar, pitch
+    
+    def put(self, key, ear, points, mar=None, pitch=None):
+        """
+        Store a result, evicting the least recently used entry if full
+        """
+        points = list(points)[:MAX_EYE_POINTS]
+        
+        with self._lock:
+            slot = self.index.get(key)
+            if slot is None:
+                free = len(self.index) < len(self.entries)
+                # Empty slots have last_used == 0, so argmin finds them first
+                slot = int(np.argmin(self.entries['last_used']))
+                if not free:
+                    del self.index[self.entries['key'][slot].tobytes()]
+                self.index[key] = slot
+            
+            self.tick += 1
+            entry = np.zeros((), dtype=ENTRY_DTYPE)
+            entry['key'] = np.frombuffer(key, dtype=np.uint8)
+            entry['ear'] = np.nan if ear is None else ear
+            entry['mar'] = np.nan if mar is None else mar
+            entry['pitch'] = np.nan if pitch is None else pitch
+            entry['point_count'] = len(points)
+            if points:
+                entry['points'][:len(points)] = points
+            entry['last_used'] = self.tick
+            self.entries[slot] = entry
+    
+    def flush(self):
+        """Write pending changes to disk"""
+        with self._lock:
+            self.entries.flush()
+    
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self.entries[:] = np.zeros((), dtype=ENTRY_DTYPE)
+            self.entries.flush()
+            self.index.clear()
+            self.tick = 0
+    
+    def __len__(self):
+        return len(self.index)
+    
+    def stats(self):
+        """Hit/miss counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.index),
+            'capacity': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,161 @@
+"""
+Session Lifecycle
+Student Eye Drowsiness Detection System
+This module tracks when each monitoring session last consumed a video frame
+and ends sessions whose stream has gone quiet (e.g. the browser tab was
+closed without stopping monitoring). A background sweeper thread calls back
+with the time of the last frame, so the session is logged with its true end
+time, and closes the session's streams so capture devices and detectors are
+released instead of leaking until the worker restarts. Other long-lived
+resources (e.g. room camera workers) are tracked the same way, each with
+its own idle callback.
+"""
+
+import threading
+import time
+
+
+class SessionLifecycleManager:
+    """
+    Last-activity tracking and idle-session reclamation
+    """
+    
+    def __init__(self, idle_timeout=30.0, sweep_interval=5.0, on_idle=None):
+        """
+        Args:
+            idle_timeout: Seconds without a consumed frame before a session
+                counts as abandoned
+            sweep_interval: Seconds between idle checks
+            on_idle: Callback with (key, last_seen) for each idle session,
+                last_seen being the time.time() of its last frame (keys
+                registered with their own callback use that instead)
+        """
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.on_idle = on_idle
+        
+        self.last_seen = {}  # key -> time.time() of the last activity
+        self.resources = {}  # key -> objects to close() when released
+        self.callbacks = {}  # key -> on_idle override
+        self.reclaimed = 0
+        
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper = None
+    
+    def register(self, key, now=None, on_idle=None):
+        """
+        Start tracking a session (its start counts as activity)
+        
+        Args:
+            key: Session key
+            now: Time of the activity (default: now)
+            on_idle: Callback for this key instead of the manager's
+        """
+        with self._lock:
+            self.last_seen[key] = now if now is not None else time.time()
+            self.resources.setdefault(key, [])
+            if on_idle is not None:
+                self.callbacks[key] = on_idle
+        self._ensure_sweeper()
+    
+    def touch(self, key, now=None):
+        """
+        Record activity (a frame was consumed) for a tracked session
+        """
+        if key in self.last_seen:
+            self.last_seen[key] = now if now is not None else time.time()
+    
+    def attach(self, key, resource):
+        """
+        Tie a closeable resource (e.g. a stream generator) to a session
+        
+        The session is tracked from now on if it wasn't already.
+        """
+        with self._lock:
+            self.resources.setdefault(key, []).append(resource)
+            self.last_seen.setdefault(key, time.time())
+        self._ensure_sweeper()
+    
+    def release(self, key):
+        """
+        Stop tracking a session and close its resources
+        
+        Returns:
+            float: Time of the session's last activity, or None if untracked
+        """
+        with self._lock:
+            last_seen = self.last_seen.pop(key, None)
+            resources = self.resources.pop(key, [])
+            self.callbacks.pop(key, None)
+        
+        for resource in resources:
+            try:
+                resource.close()
+            except ValueError:
+                # A generator running on its request thread; it stops
+                # itself once it sees the session has ended
+                pass
+            except Exception as e:
+                print(f"Warning: Could not release session resource: {e}")
+        return last_seen
+    
+    def idle_sessions(self, now=None):
+        """
+        Sessions without activity for longer than idle_timeout
+        
+        Returns:
+            list: (key, last_seen) tuples
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            return [(key, last_seen) for key, last_seen in self.last_seen.items()
+                    if now - last_seen > self.idle_timeout]
+    
+    def sweep(self, now=None):
+        """
+        End idle sessions once
+        
+        Returns:
+            int: Number of sessions reclaimed
+        """
+        idle = self.idle_sessions(now)
+        for key, last_seen in idle:
+            on_idle = self.callbacks.get(key, self.on_idle)
+            try:
+                if on_idle:
+                    on_idle(key, last_seen)
+            except Exception as e:
+                print(f"Warning: Could not end idle session {key}: {e}")
+            finally:
+                self.release(key)
+        
+        self.reclaimed += len(idle)
+        return len(idle)
+    
+    def _ensure_sweeper(self):
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        with self._lock:
+            if self._sweeper is None or not self._sweeper.is_alive():
+                self._stop.clear()
+                self._sweeper = threading.Thread(target=self._run, daemon=True, name='sedds-session-sweeper')
+                self._sweeper.start()
+    
+    def _run(self):
+        while not self._stop.wait(self.sweep_interval):
+            self.sweep()
+    
+    def stop(self):
+        """Stop the sweeper thread"""
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=self.sweep_interval + 1.0)
+        self._sweeper = None
+    
+    def stats(self):
+        return {
+            'tracked': len(self.last_seen),
+            'reclaimed': self.reclaimed,
+            'idle_timeout': self.idle_timeout,
+        }
@@ -0,0 +1,55 @@
+"""
+Management command to benchmark the detector profiles on this machine
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from drowsiness_app.detector_profiles import DETECTOR_PROFILES, benchmark_profiles, select_profile, store_auto_profile
+from drowsiness_app.frame_sources import FrameSourceError, open_source
+
+
+class Command(BaseCommand):
+    help = 'Measure per-frame detection latency of each detector profile and suggest one'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=settings.SEDDS_DETECTOR_TARGET_MS,
+                            help='Per-frame latency target (p95, milliseconds)')
+        parser.add_argument('--frames', type=int, default=40, help='Frames timed per profile')
+        parser.add_argument('--source', help='Video file or image directory to benchmark on (default: synthetic face)')
+        parser.add_argument('--profiles', help=f"Comma-separated profiles (default: {','.join(DETECTOR_PROFILES)})")
+    
+    def handle(self, *args, **options):
+        names = None
+        if options['profiles']:
+            names = [name.strip() for name in options['profiles'].split(',') if name.strip()]
+            unknown = [name for name in names if name not in DETECTOR_PROFILES]
+            if unknown:
+                raise CommandError(f"Unknown profiles: {', '.join(unknown)}")
+        
+        frames = None
+        if options['source']:
+            try:
+                with open_source(options['source'], realtime=False) as source:
+                    frames = [frame for _, frame in zip(range(options['frames']), source)]
+            except FrameSourceError as e:
+                raise CommandError(str(e))
+            if not frames:
+                raise CommandError(f"No frames in {options['source']}")
+        
+        results = benchmark_profiles(names, frames=frames, n_frames=options['frames'])
+        if not results:
+            raise CommandError('None of the profiles can run here (is MediaPipe installed?)')
+        
+        self.stdout.write(f"{'profile':<12}{'mean ms':>10}{'p95 ms':>10}{'faces':>8}  description")
+        for result in results:
+            self.stdout.write(f"{result['profile']:<12}{result['mean_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                              f"{result['face_rate']:>8.0%}  {DETECTOR_PROFILES[result['profile']]['description']}")
+        
+        choice = select_profile(results, options['target_ms'])
+        if names is None and frames is None:
+            # Same measurement as the server's auto benchmark; servers
+            # sharing the cache backend use it instead of benchmarking
+            store_auto_profile(options['target_ms'], choice)
+        self.stdout.write('')
+        self.stdout.write(f"Suggested profile for a {options['target_ms']:.1f} ms target: {choice} "
+                          f"(set SEDDS_DETECTOR_PROFILE={choice}, or 'auto' to pick at run time)")
@@ -0,0 +1,44 @@
+"""
+Management command to export session and alert data
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from drowsiness_app.exports import export_stream, parse_filter_date, EXPORT_KINDS, EXPORT_FORMATS
+
+
+class Command(BaseCommand):
+    help = 'Stream session or alert data as CSV or NDJSON (constant memory)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=EXPORT_KINDS, default='sessions')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--user', help='Only this username')
+        parser.add_argument('--batch', help='Only this batch year')
+        parser.add_argument('--start', help='First session date (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last session date (YYYY-MM-DD)')
+        parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+    
+    def handle(self, *args, **options):
+        try:
+            start_date = parse_filter_date(options['start'], '--start date')
+            end_date = parse_filter_date(options['end'], '--end date')
+        except ValueError as e:
+            raise CommandError(str(e))
+        
+        chunks = export_stream(
+            kind=options['kind'],
+            fmt=options['format'],
+            username=options['user'],
+            batch_year=options['batch'],
+            start_date=start_date,
+            end_date=end_date,
+        )
+        
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+
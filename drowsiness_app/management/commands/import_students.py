@@ -0,0 +1,55 @@
+"""
+Management command to enroll students in bulk from a CSV file
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from drowsiness_app.enrollment import (
+    IMPORT_BATCH_SIZE, OPTIONAL_COLUMNS, REQUIRED_COLUMNS, import_students, read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (f"Create students from a CSV file with columns {', '.join(REQUIRED_COLUMNS)} "
+            f"and optionally {', '.join(OPTIONAL_COLUMNS)}")
+    
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='CSV file with a header row')
+        parser.add_argument('--workers', type=int, help='Password hashing processes (default: CPU count)')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Rows inserted per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without creating anyone')
+        parser.add_argument('--errors', help='Write the rejected rows (line, username, error) to this CSV file')
+    
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as csv_file:
+                rows = read_rows(csv_file)
+        except (OSError, UnicodeDecodeError, ValueError, csv.Error) as e:
+            raise CommandError(f"Can't read {options['csv_file']}: {e}")
+        
+        report = import_students(rows, workers=options['workers'], batch_size=options['batch_size'],
+                                 dry_run=options['dry_run'])
+        
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']} ({error['username'] or '-'}): {error['error']}")
+        if options['errors'] and report['errors']:
+            with open(options['errors'], 'w', newline='', encoding='utf-8') as output:
+                writer = csv.DictWriter(output, fieldnames=['line', 'username', 'error'])
+                writer.writeheader()
+                writer.writerows(report['errors'])
+        
+        seconds = report['seconds']
+        if report['dry_run']:
+            self.stdout.write(f"Dry run: {report['valid']} of {report['rows']} rows valid, "
+                              f"{report['failed']} rejected ({seconds['validate']:.2f} s)")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']} of {report['rows']} students, {report['failed']} rejected "
+            f"in {seconds['total']:.2f} s ({report['rows_per_second']:.1f} students/s: "
+            f"validate {seconds['validate']:.2f} s, hash {seconds['hash']:.2f} s, "
+            f"insert {seconds['insert']:.2f} s)"
+        ))
@@ -0,0 +1,313 @@
+"""
+Management command to load-test a running SEDDS server
+
+Run the server with a camera-free video source, e.g.
+    SEDDS_VIDEO_SOURCE=synthetic python manage.py runserver
+then
+    python manage.py loadtest --users 20 --duration 60 --create-users
+
+Students stream in the deployment's SEDDS_STREAM_MODE unless --mode is given.
+"""
+import http.cookiejar
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Part separator of the MJPEG video feed
+FRAME_BOUNDARY = b'--frame\r\n'
+
+# Start of a per-frame metadata event (alert events start with 'event:');
+# reading starts as if after an event so the first one is counted too
+METADATA_EVENT = b'\n\ndata: '
+METADATA_EVENT_START = b'\n\n'
+
+# Monitoring page streams per mode: (endpoint, path) pairs
+STREAM_MODES = ('server', 'client', 'metadata')
+MODE_STREAMS = {
+    'server': [('video_feed', '/video-feed/')],
+    'client': [('video_feed', '/video-feed/?overlay=client'), ('metadata_feed', '/metadata-feed/')],
+    'metadata': [('metadata_feed', '/metadata-feed/?video=none')],
+}
+
+
+class LoadTestStats:
+    """
+    Thread-safe collection of request latencies, errors and frame counts
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}  # endpoint -> [seconds]
+        self.errors = {}  # endpoint -> count
+        self.frames_received = 0
+        self.frames_expected = 0
+        self.frame_gaps = []
+        self.metadata_events = 0
+        self.metadata_seconds = 0.0
+    
+    def record(self, endpoint, latency=None, error=False):
+        with self._lock:
+            self.latencies.setdefault(endpoint, [])
+            self.errors.setdefault(endpoint, 0)
+            if error:
+                self.errors[endpoint] += 1
+            else:
+                self.latencies[endpoint].append(latency)
+    
+    def record_video(self, received, expected, gaps):
+        with self._lock:
+            self.frames_received += received
+            self.frames_expected += expected
+            self.frame_gaps.extend(gaps)
+    
+    def record_metadata(self, events, seconds):
+        with self._lock:
+            self.metadata_events += events
+            self.metadata_seconds += seconds
+
+
+class SimulatedStudent(threading.Thread):
+    """
+    One student: log in, monitor (video + stats polls + alerts), stop
+    """
+    
+    def __init__(self, base_url, username, password, stats, duration, mode='server',
+                 stats_interval=1.0, alerts=3, fps=30, timeout=30):
+        super().__init__(daemon=True)
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.stats = stats
+        self.duration = duration
+        self.mode = mode
+        self.stats_interval = stats_interval
+        self.alerts = alerts
+        self.fps = fps
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.stream_stop = threading.Event()
+    
+    def _csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+    
+    def _request(self, endpoint, path, data=None):
+        """
+        Make a timed request
+        
+        Returns:
+            response body (bytes) or None on error
+        """
+        headers = {'X-CSRFToken': self._csrf_token()}
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers)
+        
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                content = response.read()
+                final_url = response.geturl()
+        except (urllib.error.URLError, OSError):
+            self.stats.record(endpoint, error=True)
+            return None
+        
+        # Unauthenticated requests are redirected to the login page
+        if endpoint != 'login_page' and '/login/' in urllib.parse.urlparse(final_url).path:
+            self.stats.record(endpoint, error=True)
+            return None
+        
+        self.stats.record(endpoint, time.perf_counter() - start)
+        return content
+    
+    def _consume(self, endpoint, path):
+        """
+        Read a streaming response (MJPEG video or metadata events),
+        counting its parts and the gaps between them
+        """
+        if endpoint == 'video_feed':
+            separator, tail = FRAME_BOUNDARY, b''
+        else:
+            separator, tail = METADATA_EVENT, METADATA_EVENT_START
+        request = urllib.request.Request(self.base_url + path)
+        received = 0
+        gaps = []
+        start = time.perf_counter()
+        
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                last_part = None
+                while not self.stream_stop.is_set():
+                    chunk = response.read1(65536)
+                    if not chunk:
+                        break
+                    
+                    # Count separators, including ones split across reads
+                    data = tail + chunk
+                    tail = data[-(len(separator) - 1):]
+                    for _ in range(data.count(separator)):
+                        now = time.perf_counter()
+                        if last_part is None:
+                            self.stats.record(f'{endpoint}_first', now - start)
+                        else:
+                            gaps.append(now - last_part)
+                        last_part = now
+                        received += 1
+        except (urllib.error.URLError, OSError):
+            self.stats.record(endpoint, error=True)
+            return
+        
+        elapsed = time.perf_counter() - start
+        if endpoint == 'video_feed':
+            self.stats.record_video(received, int(elapsed * self.fps), gaps)
+        else:
+            self.stats.record_metadata(received, elapsed)
+    
+    def run(self):
+        # Log in
+        if self._request('login_page', '/login/') is None:
+            return
+        if self._request('login', '/login/', {
+            'username': self.username,
+            'password': self.password,
+            'csrfmiddlewaretoken': self._csrf_token(),
+        }) is None:
+            return
+        
+        if self._request('start_monitoring', f'/start-monitoring/?mode={self.mode}') is None:
+            return
+        
+        streams = [threading.Thread(target=self._consume, args=stream, daemon=True)
+                   for stream in MODE_STREAMS[self.mode]]
+        for stream in streams:
+            stream.start()
+        
+        # Poll stats and raise alerts spread over the session
+        start = time.perf_counter()
+        alert_times = [self.duration * (i + 1) / (self.alerts + 1) for i in range(self.alerts)]
+        while time.perf_counter() - start < self.duration:
+            self._request('session_stats', '/api/session-stats/')
+            elapsed = time.perf_counter() - start
+            while alert_times and alert_times[0] <= elapsed:
+                alert_times.pop(0)
+                self._request('drowsiness_alert', '/api/drowsiness-alert/', {})
+            time.sleep(self.stats_interval)
+        
+        # Stop (this also ends the server's streams)
+        self._request('stop_monitoring', '/stop-monitoring/')
+        self.stream_stop.set()
+        for stream in streams:
+            stream.join(self.timeout)
+
+
+class Command(BaseCommand):
+    help = 'Simulate a classroom of students against a running server and report latency and throughput'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server base URL')
+        parser.add_argument('--users', type=int, default=10, help='Number of simulated students')
+        parser.add_argument('--duration', type=float, default=30.0, help='Monitoring time per student (seconds)')
+        parser.add_argument('--ramp-up', type=float, default=5.0, help='Time over which students start (seconds)')
+        parser.add_argument('--stats-interval', type=float, default=1.0, help='Session stats poll interval (seconds)')
+        parser.add_argument('--alerts', type=int, default=3, help='Drowsiness alerts posted per student')
+        parser.add_argument('--mode', choices=STREAM_MODES, default=settings.SEDDS_STREAM_MODE,
+                            help='Monitoring stream mode (default: SEDDS_STREAM_MODE)')
+        parser.add_argument('--fps', type=float, default=30.0, help='Expected video frame rate')
+        parser.add_argument('--user-prefix', default='loadtest_', help='Username prefix of simulated students')
+        parser.add_argument('--password', default='loadtest-pass-2024', help='Password of simulated students')
+        parser.add_argument('--create-users', action='store_true', help='Create missing simulated students')
+    
+    def handle(self, *args, **options):
+        n_users = options['users']
+        if n_users < 1:
+            raise CommandError('--users must be at least 1')
+        
+        usernames = [f"{options['user_prefix']}{i:03d}" for i in range(n_users)]
+        if options['create_users']:
+            self._create_users(usernames, options['password'])
+        
+        stats = LoadTestStats()
+        students = [
+            SimulatedStudent(
+                options['url'], username, options['password'], stats,
+                duration=options['duration'],
+                mode=options['mode'],
+                stats_interval=options['stats_interval'],
+                alerts=options['alerts'],
+                fps=options['fps'],
+            )
+            for username in usernames
+        ]
+        
+        self.stdout.write(f"Starting {n_users} students against {options['url']} "
+                          f"({options['duration']:.0f} s each, {options['ramp_up']:.0f} s ramp-up, "
+                          f"{options['mode']} stream mode)")
+        
+        start = time.perf_counter()
+        delay = options['ramp_up'] / n_users
+        for student in students:
+            student.start()
+            time.sleep(delay)
+        for student in students:
+            student.join()
+        elapsed = time.perf_counter() - start
+        
+        self._report(stats, elapsed, options['mode'])
+    
+    def _create_users(self, usernames, password):
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        missing = [username for username in usernames if username not in existing]
+        for username in missing:
+            User.objects.create_user(username=username, password=password, first_name='Load Test')
+        if missing:
+            self.stdout.write(f"Created {len(missing)} simulated students")
+    
+    def _report(self, stats, elapsed, mode):
+        self.stdout.write('')
+        self.stdout.write(f"{'endpoint':<20}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        
+        total_requests = 0
+        total_errors = 0
+        for endpoint in sorted(stats.latencies):
+            latencies = np.array(stats.latencies[endpoint]) * 1000
+            errors = stats.errors[endpoint]
+            total_requests += len(latencies) + errors
+            total_errors += errors
+            
+            if len(latencies):
+                p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+                self.stdout.write(f"{endpoint:<20}{len(latencies):>8}{errors:>8}"
+                                  f"{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{latencies.max():>10.1f}")
+            else:
+                self.stdout.write(f"{endpoint:<20}{0:>8}{errors:>8}{'-':>10}{'-':>10}{'-':>10}{'-':>10}")
+        
+        self.stdout.write('')
+        self.stdout.write(f"Stream mode:    {mode}")
+        self.stdout.write(f"Elapsed:        {elapsed:.1f} s")
+        self.stdout.write(f"Throughput:     {total_requests / elapsed:.1f} requests/s")
+        self.stdout.write(f"Error rate:     {100.0 * total_errors / max(total_requests, 1):.2f}%")
+        
+        if stats.metadata_seconds:
+            self.stdout.write(f"Metadata:       {stats.metadata_events} events, "
+                              f"~{stats.metadata_events / stats.metadata_seconds:.1f} per second per student")
+        if not stats.frames_expected:
+            return
+        
+        dropped = max(stats.frames_expected - stats.frames_received, 0)
+        self.stdout.write(f"Video frames:   {stats.frames_received} received, {stats.frames_expected} expected, "
+                          f"{dropped} dropped ({100.0 * dropped / max(stats.frames_expected, 1):.1f}%)")
+        if stats.frame_gaps:
+            gaps = np.array(stats.frame_gaps) * 1000
+            self.stdout.write(f"Frame interval: p50 {np.percentile(gaps, 50):.1f} ms, "
+                              f"p95 {np.percentile(gaps, 95):.1f} ms, "
+                              f"~{1000.0 / gaps.mean():.1f} fps per student")
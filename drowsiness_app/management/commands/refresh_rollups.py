@@ -0,0 +1,24 @@
+"""
+Management command to refresh the cohort analytics rollups
+"""
+from django.core.management.base import BaseCommand
+
+from drowsiness_app.analytics import refresh_rollups, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Roll up ended sessions into the daily cohort analytics table'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Discard all rollups and recompute them from every session')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Sessions loaded per query')
+    
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            count = rebuild_rollups(chunk_size=options['chunk_size'])
+        else:
+            count = refresh_rollups(chunk_size=options['chunk_size'])
+        
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {count} sessions.'))
@@ -0,0 +1,107 @@
+"""
+Management command to sweep detection parameters over a recorded session
+"""
+import csv
+import os
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from drowsiness_app.detector_profiles import DETECTOR_PROFILES, AUTO_PROFILE
+from drowsiness_app.landmark_cache import LandmarkCache
+from drowsiness_app.replay import EARTrace, record_trace, sweep
+
+
+def parse_values(value, cast):
+    """
+    Parse 'a,b,c' or a 'start:stop:step' range (stop inclusive)
+    """
+    try:
+        if ':' in value:
+            start, stop, step = (float(part) for part in value.split(':'))
+            values = np.arange(start, stop + step / 2, step)
+        else:
+            values = [float(part) for part in value.split(',') if part.strip()]
+        return [cast(v) for v in values]
+    except ValueError:
+        raise CommandError(f'Invalid value list: {value}')
+
+
+class Command(BaseCommand):
+    help = 'Replay a recorded session for a grid of EAR thresholds, consecutive frames and frame skips'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Trace (.npz) or video source (file, image directory, ...)')
+        parser.add_argument('--thresholds', default='0.18:0.30:0.01', help="EAR thresholds ('a,b,c' or 'start:stop:step')")
+        parser.add_argument('--consecutive', default='10,15,20,25,30', help='CONSECUTIVE_FRAMES values')
+        parser.add_argument('--skip', help='FRAME_SKIP values; a video is recorded once per value '
+                                           '(default: the detector\'s FRAME_SKIP, or the trace\'s)')
+        parser.add_argument('--profile', choices=list(DETECTOR_PROFILES) + [AUTO_PROFILE],
+                            default=settings.SEDDS_DETECTOR_PROFILE, help='Detector profile to record with')
+        parser.add_argument('--save-trace', help='Where to save the recorded trace (.npz)')
+        parser.add_argument('--max-frames', type=int, help='Only record this many frames')
+        parser.add_argument('--landmark-cache', help='Directory of a landmark cache reused across recordings')
+        parser.add_argument('--format', choices=('table', 'csv'), default='table')
+    
+    def handle(self, *args, **options):
+        source = options['source']
+        skips = parse_values(options['skip'], int) if options['skip'] else [None]
+        if any(skip is not None and skip < 1 for skip in skips):
+            raise CommandError('Frame skips must be at least 1')
+        
+        # Record once per frame skip (face detection), or reuse a saved trace
+        if source.endswith('.npz'):
+            if not os.path.exists(source):
+                raise CommandError(f'Trace not found: {source}')
+            trace = EARTrace.load(source)
+            if skips != [None] and skips != [trace.frame_skip]:
+                raise CommandError(f'{source} was recorded at frame skip {trace.frame_skip}; '
+                                   f'record the video again to sweep other frame skips')
+            traces = [trace]
+        else:
+            if options['save_trace'] and len(skips) > 1:
+                raise CommandError('--save-trace needs a single --skip value')
+            cache = LandmarkCache(options['landmark_cache']) if options['landmark_cache'] else None
+            traces = []
+            for skip in skips:
+                started = time.perf_counter()
+                trace = record_trace(source, max_frames=options['max_frames'], landmark_cache=cache,
+                                     frame_skip=skip, profile=options['profile'])
+                self.stderr.write(f'Recorded {len(trace)} frames at frame skip {trace.frame_skip} '
+                                  f'in {time.perf_counter() - started:.1f} s')
+                traces.append(trace)
+            if cache is not None:
+                self.stderr.write(f'Landmark cache: {cache.stats()}')
+            if options['save_trace']:
+                traces[0].save(options['save_trace'])
+                self.stderr.write(f"Saved trace to {options['save_trace']}")
+        
+        if any(len(trace) == 0 for trace in traces):
+            raise CommandError('The source produced no frames')
+        
+        started = time.perf_counter()
+        thresholds = parse_values(options['thresholds'], float)
+        consecutive_frames = parse_values(options['consecutive'], int)
+        results = []
+        for trace in traces:
+            results.extend(sweep(trace, thresholds=thresholds, consecutive_frames=consecutive_frames))
+        self.stderr.write(f'Replayed {len(results)} configurations over {traces[0].duration:.0f} s '
+                          f'of video in {time.perf_counter() - started:.3f} s')
+        
+        if options['format'] == 'csv':
+            # One write per row, each ending in the line terminator, so
+            # OutputWrapper adds no extra newline
+            writer = csv.DictWriter(self.stdout, fieldnames=list(results[0].keys()) if results else [],
+                                    lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(results)
+            return
+        
+        self.stdout.write(f"{'skip':>5}{'threshold':>11}{'consec':>8}{'alerts':>8}{'per hour':>10}{'first (s)':>11}{'drowsy %':>10}")
+        for row in results:
+            first = f"{row['first_alert']:.1f}" if row['first_alert'] is not None else '-'
+            self.stdout.write(f"{row['frame_skip']:>5}{row['threshold']:>11.3f}{row['consecutive_frames']:>8}"
+                              f"{row['alerts']:>8}{row['alerts_per_hour']:>10.1f}{first:>11}"
+                              f"{100 * row['drowsy_fraction']:>10.1f}")
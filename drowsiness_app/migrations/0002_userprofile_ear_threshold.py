@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drowsiness_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='calibrated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='ear_threshold',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drowsiness_app', '0002_userprofile_ear_threshold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sessionlog',
+            name='rolled_up',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('batch_year', models.CharField(blank=True, default='', max_length=20)),
+                ('session_count', models.IntegerField(default=0)),
+                ('alert_count', models.IntegerField(default=0)),
+                ('monitored_seconds', models.FloatField(default=0)),
+            ],
+            options={
+                'db_table': 'daily_rollups',
+                'indexes': [models.Index(fields=['batch_year', 'date'], name='daily_rollu_batch_y_f64322_idx')],
+                'unique_together': {('date', 'hour', 'batch_year')},
+            },
+        ),
+    ]
@@ -6,9 +6,31 @@ Using SQLite for data storage
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
 import json
 
 
+# Cache key for a user's calibrated EAR threshold
+EAR_THRESHOLD_CACHE_KEY = 'sedds:ear_threshold:{user_id}'
+
+# Cache key for an ended session's report data
+SESSION_REPORT_CACHE_KEY = 'sedds:session_report:{session_id}'
+
+# Template fragments ({% cache %} names) that vary on the user's sessions
+SESSION_FRAGMENTS = ('dashboard_stats', 'dashboard_recent', 'session_history')
+
+
+def invalidate_session_cache(user_id, session_id=None):
+    """
+    Drop cached fragments (and report data) derived from a user's sessions
+    """
+    keys = [make_template_fragment_key(name, [user_id]) for name in SESSION_FRAGMENTS]
+    if session_id is not None:
+        keys.append(SESSION_REPORT_CACHE_KEY.format(session_id=session_id))
+    cache.delete_many(keys)
+
+
 class SessionLog(models.Model):
     """
     Model to store drowsiness detection session logs
@@ -19,6 +41,7 @@ class SessionLog(models.Model):
     alert_count = models.IntegerField(default=0)
     drowsy_timestamps = models.TextField(default='[]')  # Store timestamps of drowsiness alerts as JSON string
     session_duration = models.DurationField(null=True, blank=True)
+    rolled_up = models.BooleanField(default=False, db_index=True)  # Included in DailyRollup
     
     class Meta:
         db_table = 'session_logs'
@@ -27,6 +50,23 @@ class SessionLog(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_session_cache(self.user_id, self.pk)
+    
+    def delete(self, *args, **kwargs):
+        user_id, session_id = self.user_id, self.pk
+        result = super().delete(*args, **kwargs)
+        invalidate_session_cache(user_id, session_id)
+        return result
+    
+    def get_drowsy_times(self):
+        """Alert timestamps as a list"""
+        try:
+            return json.loads(self.drowsy_timestamps)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    
     def add_drowsy_alert(self, timestamp=None):
         """Add a drowsiness alert timestamp"""
         if timestamp is None:
@@ -40,14 +80,16 @@ class SessionLog(models.Model):
         timestamps.append(timestamp)
         self.drowsy_timestamps = json.dumps(timestamps)
         self.alert_count += 1
-        self.save()
+        # Only the changed fields: a full save from a stale copy would
+        # write back rolled_up=False after the session was rolled up
+        self.save(update_fields=['drowsy_timestamps', 'alert_count'])
     
-    def end_session(self):
-        """End the current session and calculate duration"""
-        self.session_end = timezone.now()
+    def end_session(self, end_time=None):
+        """End the current session (now, or at end_time) and calculate duration"""
+        self.session_end = end_time or timezone.now()
         if self.session_start:
             self.session_duration = self.session_end - self.session_start
-        self.save()
+        self.save(update_fields=['session_end', 'session_duration'])
     
     def get_session_duration_str(self):
         """Get session duration as formatted string"""
@@ -69,6 +111,8 @@ class UserProfile(models.Model):
     batch_year = models.CharField(max_length=20, null=True, blank=True)
     total_sessions = models.IntegerField(default=0)
     total_alerts = models.IntegerField(default=0)
+    ear_threshold = models.FloatField(null=True, blank=True)  # Personal calibrated EAR threshold
+    calibrated_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -83,4 +127,49 @@ class UserProfile(models.Model):
         self.total_sessions = sessions.count()
         self.total_alerts = sum(session.alert_count for session in sessions)
         self.save()
+    
+    def set_ear_threshold(self, threshold):
+        """Store a calibrated EAR threshold and refresh the cache"""
+        self.ear_threshold = threshold
+        self.calibrated_at = timezone.now()
+        self.save(update_fields=['ear_threshold', 'calibrated_at'])
+        cache.set(EAR_THRESHOLD_CACHE_KEY.format(user_id=self.user_id), threshold, None)
+    
+    @classmethod
+    def get_ear_threshold(cls, user_id):
+        """
+        Get a user's calibrated EAR threshold, from the cache if possible
+        
+        Returns:
+            float: Threshold, or None if the user hasn't been calibrated
+        """
+        key = EAR_THRESHOLD_CACHE_KEY.format(user_id=user_id)
+        threshold = cache.get(key)
+        if threshold is None:
+            threshold = cls.objects.filter(user_id=user_id).values_list('ear_threshold', flat=True).first()
+            if threshold is not None:
+                cache.set(key, threshold, None)
+        return threshold
 
+
+class DailyRollup(models.Model):
+    """
+    Precomputed drowsiness totals per batch, day and hour of day
+    
+    Updated incrementally as sessions end, so cohort reports never scan
+    session_logs.
+    """
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()  # Local hour of day (0-23)
+    batch_year = models.CharField(max_length=20, blank=True, default='')
+    session_count = models.IntegerField(default=0)  # Sessions started in this hour
+    alert_count = models.IntegerField(default=0)
+    monitored_seconds = models.FloatField(default=0)
+    
+    class Meta:
+        db_table = 'daily_rollups'
+        unique_together = ['date', 'hour', 'batch_year']
+        indexes = [models.Index(fields=['batch_year', 'date'])]
+    
+    def __str__(self):
+        return f"{self.batch_year or 'No batch'} - {self.date} {self.hour:02d}:00"
@@ -0,0 +1,298 @@
+"""
+Multi-Face Drowsiness Detection
+Student Eye Drowsiness Detection System
+This module extends the single-face detector to track several faces per
+frame, assigning each a stable ID and its own drowsiness state machine.
+"""
+
+import cv2
+import numpy as np
+from collections import deque
+
+from .drowsiness_detector import DrowsinessDetector
+from .signal_processing import EARFilter
+
+
+class FaceTrack:
+    """
+    A tracked face with its own drowsiness state
+    """
+    
+    def __init__(self, face_id, centroid):
+        self.face_id = face_id
+        self.centroid = centroid
+        self.missed_frames = 0
+        
+        # Per-face state variables (mirrors DrowsinessDetector)
+        self.ear_values = deque(maxlen=100)
+        self.ear_filter = EARFilter()
+        self.smoothed_ear = 0.0
+        self.frame_counter = 0
+        self.drowsy_counter = 0
+        self.alert_triggered = False
+        self.eye_points = []
+    
+    def update(self, ear_value, ear_threshold, consecutive_frames):
+        """
+        Feed a new raw EAR value into the face's drowsiness state machine
+        
+        Returns:
+            bool: True when a new drowsiness alert starts on this frame
+        """
+        self.ear_values.append(ear_value)
+        self.smoothed_ear = self.ear_filter.update(ear_value)
+        
+        if self.smoothed_ear < ear_threshold:
+            self.frame_counter += 1
+            
+            if self.frame_counter >= consecutive_frames and not self.alert_triggered:
+                self.alert_triggered = True
+                self.drowsy_counter += 1
+                return True
+        else:
+            self.frame_counter = 0
+            self.alert_triggered = False
+        
+        return False
+    
+    def is_drowsy(self, consecutive_frames):
+        """Whether the face is currently in the drowsy state"""
+        return self.frame_counter >= consecutive_frames
+
+
+class FaceTracker:
+    """
+    Assign stable IDs to faces across frames by nearest-centroid matching
+    
+    Held tracks (faces assigned to a student) survive much longer out of
+    view and are picked up again from further away, so a student who drops
+    their head for a while keeps their face ID.
+    """
+    
+    def __init__(self, max_distance=0.15, max_missed_frames=15, max_held_frames=300,
+                 rematch_distance=0.3):
+        self.max_distance = max_distance  # In normalised frame units
+        self.max_missed_frames = max_missed_frames  # Processed frames
+        self.max_held_frames = max_held_frames  # Processed frames (about 20 s)
+        self.rematch_distance = rematch_distance  # For held tracks out of view
+        self.tracks = {}
+        self.next_id = 1
+    
+    def update(self, centroids, held_ids=()):
+        """
+        Match detected face centroids to existing tracks
+        
+        Args:
+            centroids: List of normalised (x, y) face centres
+            held_ids: IDs of tracks to keep (e.g. assigned faces)
+        
+        Returns:
+            list: FaceTrack for each centroid, in the same order
+        """
+        held_ids = set(held_ids)
+        track_ids = list(self.tracks.keys())
+        matched = [None] * len(centroids)
+        used_tracks = set()
+        
+        if track_ids and centroids:
+            # Pairwise distances between known tracks and new detections
+            known = np.array([self.tracks[t].centroid for t in track_ids])
+            found = np.array(centroids)
+            distances = np.linalg.norm(known[:, None, :] - found[None, :, :], axis=2)
+            order = np.argsort(distances, axis=None)
+            
+            # Greedy assignment, closest pairs first
+            for flat_index in order:
+                ti, di = divmod(int(flat_index), len(centroids))
+                if distances[ti, di] > self.max_distance:
+                    break
+                if ti in used_tracks or matched[di] is not None:
+                    continue
+                used_tracks.add(ti)
+                matched[di] = self.tracks[track_ids[ti]]
+            
+            # Held tracks out of view may come back further away (a head
+            # lifted from the desk) before a new track is started
+            for flat_index in order:
+                ti, di = divmod(int(flat_index), len(centroids))
+                if distances[ti, di] > self.rematch_distance:
+                    break
+                track = self.tracks[track_ids[ti]]
+                if (ti in used_tracks or matched[di] is not None or not track.missed_frames
+                        or track.face_id not in held_ids):
+                    continue
+                used_tracks.add(ti)
+                matched[di] = track
+        
+        # Age out unmatched tracks
+        for ti, track_id in enumerate(track_ids):
+            if ti not in used_tracks:
+                track = self.tracks[track_id]
+                track.missed_frames += 1
+                limit = self.max_held_frames if track_id in held_ids else self.max_missed_frames
+                if track.missed_frames > limit:
+                    del self.tracks[track_id]
+        
+        # Update matched tracks and start new ones
+        for di, centroid in enumerate(centroids):
+            track = matched[di]
+            if track is None:
+                track = FaceTrack(self.next_id, centroid)
+                self.tracks[self.next_id] = track
+                self.next_id += 1
+                matched[di] = track
+            track.centroid = centroid
+            track.missed_frames = 0
+        
+        return matched
+    
+    def reset(self):
+        """Forget all tracks"""
+        self.tracks = {}
+        self.next_id = 1
+
+
+class MultiFaceDetector(DrowsinessDetector):
+    """
+    Drowsiness detection for every face in the frame
+    
+    Unlike DrowsinessDetector.process_frame, process_frame here returns
+    (processed_frame, faces) where faces is a list of per-face state dicts.
+    """
+    
+    def __init__(self, max_num_faces=4, render_overlay=True, profile=None):
+        super().__init__(render_overlay=render_overlay, max_num_faces=max_num_faces, profile=profile)
+        self.tracker = FaceTracker()
+        
+        # Callback with the face ID that became drowsy
+        self.on_face_drowsy = None
+        
+        # Face ID -> user ID, for attributing alerts, and face ID -> the
+        # user's EAR threshold (both may be shared with the owner)
+        self.face_owners = {}
+        self.face_thresholds = {}
+    
+    def detect_faces(self, frame):
+        """
+        Detect all faces and calculate their EAR
+        
+        Returns:
+            list: (centroid, ear, eye_points) per face, coordinates normalised
+        """
+        h, w = frame.shape[:2]
+        detections = []
+        
+        if self.use_mediapipe:
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            results = self.face_mesh.process(rgb_frame)
+            
+            for face_landmarks in results.multi_face_landmarks or []:
+                ear, eye_points = self._face_ear(face_landmarks, w, h)
+                points = [(x / w, y / h) for x, y in eye_points]
+                centroid = tuple(np.mean(points, axis=0))
+                detections.append((centroid, ear, points))
+        else:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            faces = self.face_cascade.detectMultiScale(gray, 1.2, 4)
+            
+            for (x, y, fw, fh) in faces[:self.max_num_faces]:
+                face_box = (int(x), int(y), int(fw), int(fh))
+                eye_boxes = self._haar_eye_boxes(gray, face_box)
+                ear, eye_rects = self._haar_eye_openness(gray, face_box, eye_boxes)
+                if ear is None:
+                    continue
+                points = [((ex + ew / 2) / w, (ey + eh / 2) / h) for (ex, ey, ew, eh) in eye_rects]
+                centroid = ((x + fw / 2) / w, (y + fh / 2) / h)
+                detections.append((centroid, ear, points))
+        
+        return detections
+    
+    def process_frame(self, frame):
+        """
+        Process a single frame for drowsiness detection of all faces
+        
+        Returns:
+            tuple: (processed_frame, faces)
+        """
+        if frame is None:
+            return None, []
+        
+        self.frame_count += 1
+        
+        # Skip frames for performance optimization
+        if self.frame_count % self.FRAME_SKIP != 0:
+            if self.render_overlay:
+                self._draw_faces(frame)
+            return frame, self.get_face_states()
+        
+        # Resize frame for processing (performance optimization)
+        small_frame = cv2.resize(frame, self.process_size)
+        detections = self.detect_faces(small_frame)
+        # Assigned faces are held, so their students keep their face IDs
+        tracks = self.tracker.update([centroid for centroid, _, _ in detections], held_ids=list(self.face_owners))
+        
+        for track, (_, ear, points) in zip(tracks, detections):
+            track.eye_points = points
+            threshold = self.face_thresholds.get(track.face_id, self.EAR_THRESHOLD)
+            
+            if track.update(ear, threshold, self.CONSECUTIVE_FRAMES):
+                self.drowsy_counter += 1
+                
+                # Rate limit per student when the face is assigned, else per face
+                user_id = self.face_owners.get(track.face_id)
+                key = f"user:{user_id}" if user_id is not None else f"{self.alert_key or id(self)}:face:{track.face_id}"
+                self.dispatch_alert(key=key, user_id=user_id, face_id=track.face_id, ear=round(track.smoothed_ear, 3))
+                
+                if self.on_face_drowsy:
+                    self.on_face_drowsy(track.face_id)
+        
+        self.face_detected = bool(detections)
+        
+        if self.render_overlay:
+            self._draw_faces(frame)
+        
+        return frame, self.get_face_states()
+    
+    def get_face_states(self):
+        """
+        Get JSON-serialisable state for every tracked face
+        """
+        faces = []
+        for track in self.tracker.tracks.values():
+            faces.append({
+                'id': track.face_id,
+                'ear': round(float(track.smoothed_ear), 4),
+                'status': 'drowsy' if track.is_drowsy(self.CONSECUTIVE_FRAMES) else 'alert',
+                'alerts': track.drowsy_counter,
+                'visible': track.missed_frames == 0,
+                'centroid': [round(float(c), 4) for c in track.centroid],
+                'eyes': [[round(x, 4), round(y, 4)] for x, y in track.eye_points],
+            })
+        return faces
+    
+    def _draw_faces(self, frame):
+        """
+        Draw face IDs, eye points and status for every visible face
+        """
+        h, w = frame.shape[:2]
+        for track in self.tracker.tracks.values():
+            if track.missed_frames:
+                continue
+            
+            drowsy = track.is_drowsy(self.CONSECUTIVE_FRAMES)
+            color = (0, 0, 255) if drowsy else (0, 255, 0)
+            
+            for x, y in track.eye_points:
+                cv2.circle(frame, (int(x * w), int(y * h)), 2, color, -1)
+            
+            label = f"#{track.face_id} EAR: {track.smoothed_ear:.2f}" + (" DROWSY" if drowsy else "")
+            cx, cy = int(track.centroid[0] * w), int(track.centroid[1] * h)
+            cv2.putText(frame, label, (max(cx - 60, 0), max(cy - 60, 15)),
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    
+    def reset_counters(self):
+        """
+        Reset all counters and face tracks for a new session
+        """
+        super().reset_counters()
+        self.tracker.reset()
@@ -0,0 +1,160 @@
+"""
+On-Demand Stream Profiling
+Student Eye Drowsiness Detection System
+This module samples the Python stack of one thread (a session's stream
+loop) at a fixed interval for a few seconds. The samples are written as
+collapsed stacks (the input format of flamegraph.pl, speedscope, etc.)
+and attributed to pipeline stages (frame capture, detection, overlay,
+JPEG encoding, ...) to give per-frame stage timings. Nothing is installed
+in the profiled code, so there is no cost when profiling is off.
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+
+
+# (file, function or None for any, stage), checked from the innermost frame
+# outwards; the first match names the stage of a sample
+STAGE_RULES = (
+    ('drowsiness_detector.py', '_draw_frame_info', 'overlay'),
+    ('drowsiness_detector.py', 'detect_eyes', 'detect'),
+    ('multi_face.py', 'detect_faces', 'detect'),
+    ('drowsiness_detector.py', 'process_frame', 'process'),
+    ('multi_face.py', 'process_frame', 'process'),
+    ('frame_sources.py', None, 'capture'),
+    ('views.py', 'generate_video_feed', 'encode'),
+    ('views.py', 'generate_metadata_feed', 'metadata'),
+)
+
+# Samples outside the stream loop: the server writing the response or
+# waiting for the client to read it
+OTHER_STAGE = 'server'
+
+MAX_DURATION = 30.0  # Seconds
+
+
+def _frame_stack(frame, max_depth):
+    """
+    (file name, function) pairs of a frame's stack, innermost first
+    """
+    stack = []
+    while frame is not None and len(stack) < max_depth:
+        code = frame.f_code
+        stack.append((os.path.basename(code.co_filename), code.co_name))
+        frame = frame.f_back
+    return stack
+
+
+def classify_stack(stack):
+    """
+    Pipeline stage of a sampled stack (innermost frame first)
+    """
+    for filename, function in stack:
+        for rule_file, rule_function, stage in STAGE_RULES:
+            if filename == rule_file and rule_function in (None, function):
+                return stage
+    return OTHER_STAGE
+
+
+class StackSampler:
+    """
+    Sample one thread's stack at a fixed interval
+    """
+    
+    def __init__(self, thread_id, interval=0.005, max_depth=64):
+        """
+        Args:
+            thread_id: threading.get_ident() of the thread to profile
+            interval: Seconds between samples
+            max_depth: Frames kept per sample (innermost first)
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()  # Collapsed stack -> samples
+        self.stages = Counter()  # Stage -> samples
+        self.samples = 0
+        self.elapsed = 0.0
+    
+    def run(self, duration):
+        """
+        Sample until duration has passed or the thread exits
+        
+        Blocks the calling thread (the profiled thread keeps running).
+        """
+        duration = min(duration, MAX_DURATION)
+        start = time.perf_counter()
+        deadline = start + duration
+        
+        while time.perf_counter() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break  # Thread finished
+            
+            stack = _frame_stack(frame, self.max_depth)
+            del frame
+            
+            self.stacks[';'.join(f"{filename}:{function}" for filename, function in reversed(stack))] += 1
+            self.stages[classify_stack(stack)] += 1
+            self.samples += 1
+            
+            time.sleep(self.interval)
+        
+        self.elapsed = time.perf_counter() - start
+        return self
+    
+    def collapsed(self):
+        """
+        Samples in collapsed-stack format ('frame;frame;frame count' lines)
+        """
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+    
+    def stage_timings(self, frames=0):
+        """
+        Share of time per stage, and milliseconds per frame if frames (the
+        number handled while sampling) is given
+        
+        Returns:
+            dict: stage -> {'samples', 'share', 'ms_per_frame'}
+        """
+        timings = {}
+        for stage, count in self.stages.most_common():
+            share = count / self.samples
+            timings[stage] = {
+                'samples': count,
+                'share': round(share, 4),
+                'ms_per_frame': round(share * self.elapsed * 1000 / frames, 3) if frames else None,
+            }
+        return timings
+
+
+def profile_thread(thread_id, duration, interval=0.005, frame_counter=None):
+    """
+    Profile a thread for a while
+    
+    Args:
+        thread_id: Thread to sample
+        duration: Seconds to sample (at most MAX_DURATION)
+        interval: Seconds between samples
+        frame_counter: Callable returning the frames handled so far, used
+            for per-frame stage timings
+    
+    Returns:
+        dict: Samples, elapsed seconds, frames, per-stage timings and the
+        collapsed stacks
+    """
+    frames_before = frame_counter() if frame_counter else 0
+    sampler = StackSampler(thread_id, interval=interval).run(duration)
+    frames = (frame_counter() - frames_before) if frame_counter else 0
+    
+    return {
+        'samples': sampler.samples,
+        'elapsed': round(sampler.elapsed, 3),
+        'frames': frames,
+        'fps': round(frames / sampler.elapsed, 2) if sampler.elapsed else 0.0,
+        'stages': sampler.stage_timings(frames),
+        'collapsed': sampler.collapsed(),
+    }
+
@@ -0,0 +1,227 @@
+"""
+Session Replay and Threshold Sweeps
+Student Eye Drowsiness Detection System
+This module records the per-frame EAR of a video once (the expensive face
+detection step) and then replays only the drowsiness state machine over the
+cached trace. The replay is vectorized across EAR thresholds and
+consecutive-frame counts, so whole parameter grids run in well under a
+second instead of re-running face detection per configuration.
+
+A trace is recorded at one frame skip, measuring exactly the frames the
+live detector would analyse: the Haar tracker and the face mesh carry
+state from frame to frame, so detecting on extra frames would change the
+EAR they report.
+"""
+
+import numpy as np
+from django.conf import settings
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from .detector_profiles import resolve_profile
+from .drowsiness_detector import DrowsinessDetector
+from .frame_sources import open_source
+
+
+# EAR used by process_frame when no face is found
+NO_FACE_EAR = 0.3
+
+
+class EARTrace:
+    """
+    Raw EAR of the processed frames of a recording (NaN where no face was
+    found), recorded at one frame skip
+    """
+    
+    def __init__(self, timestamps, ear, source='', frame_skip=1):
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.ear = np.asarray(ear, dtype=np.float64)
+        self.source = source
+        self.frame_skip = int(frame_skip)
+    
+    def __len__(self):
+        return len(self.ear)
+    
+    @property
+    def duration(self):
+        """Recording length in seconds"""
+        if len(self.timestamps) < 2:
+            return 0.0
+        return float(self.timestamps[-1] - self.timestamps[0])
+    
+    def save(self, path):
+        """Save the trace as a compressed .npz file"""
+        np.savez_compressed(path, timestamps=self.timestamps, ear=self.ear, source=np.array(self.source),
+                            frame_skip=np.array(self.frame_skip))
+    
+    @classmethod
+    def load(cls, path):
+        """Load a trace saved with save()"""
+        with np.load(path) as data:
+            # Older traces measured every frame
+            frame_skip = int(data['frame_skip']) if 'frame_skip' in data.files else 1
+            return cls(data['timestamps'], data['ear'], str(data['source']), frame_skip)
+
+
+def record_trace(source, detector=None, max_frames=None, landmark_cache=None, frame_skip=None, profile=None):
+    """
+    Record the raw EAR of the frames the live detector would analyse
+    
+    Frames are counted and measured through the detector's own
+    next_frame_is_processed() and measure_ear(), as in process_frame, so
+    face tracking sees the same frame sequence as in a live session.
+    
+    Args:
+        source: Frame source spec (video file, image directory, ...) or a
+            FrameSource
+        detector: DrowsinessDetector to detect with (default: a new one)
+        max_frames: Stop after this many source frames
+        landmark_cache: LandmarkCache for the new detector, so re-recording
+            the same video skips face detection
+        frame_skip: FRAME_SKIP to record at (default: the detector's)
+        profile: Detector profile for the new detector (default: the
+            deployment's SEDDS_DETECTOR_PROFILE)
+    
+    Returns:
+        EARTrace
+    """
+    if detector is None:
+        profile = resolve_profile(profile or settings.SEDDS_DETECTOR_PROFILE, settings.SEDDS_DETECTOR_TARGET_MS,
+                                  wait=True)
+        detector = DrowsinessDetector(render_overlay=False, landmark_cache=landmark_cache, profile=profile)
+    if frame_skip is not None:
+        detector.FRAME_SKIP = frame_skip
+    
+    frames = source
+    if isinstance(source, (str, int)):
+        frames = open_source(source, size=detector.display_size, realtime=False, prefetch=4)
+    
+    timestamps = []
+    ears = []
+    for count, (timestamp, frame) in enumerate(frames, 1):
+        if detector.next_frame_is_processed():
+            ear = detector.measure_ear(frame)
+            timestamps.append(timestamp)
+            ears.append(np.nan if ear is None else ear)
+        
+        if max_frames is not None and count >= max_frames:
+            break
+    frames.close()
+    if detector.landmark_cache is not None:
+        detector.landmark_cache.flush()
+    
+    return EARTrace(timestamps, ears, source=str(source), frame_skip=detector.FRAME_SKIP)
+
+
+def smooth_ear(ear, window=5, alpha=0.5):
+    """
+    Vectorized equivalent of EARFilter (median, then EMA) over a whole signal
+    """
+    ear = np.asarray(ear, dtype=np.float64)
+    if len(ear) == 0:
+        return ear
+    
+    # Sliding median; the first window-1 samples use the shorter window
+    # EARFilter has seen so far
+    median = np.empty_like(ear)
+    warmup = min(window - 1, len(ear))
+    for i in range(warmup):
+        median[i] = np.median(ear[:i + 1])
+    if len(ear) >= window:
+        median[window - 1:] = np.median(sliding_window_view(ear, window), axis=1)
+    
+    # y[i] = alpha * m[i] + (1 - alpha) * y[i-1], starting at y[0] = m[0]
+    smoothed, _ = lfilter([alpha], [1.0, -(1.0 - alpha)], median, zi=[(1.0 - alpha) * median[0]])
+    return smoothed
+
+
+def _processed(trace, window, alpha):
+    """
+    Timestamps and smoothed EAR of the trace, as process_frame computes them
+    """
+    ear = np.where(np.isnan(trace.ear), NO_FACE_EAR, trace.ear)
+    return trace.timestamps, smooth_ear(ear, window, alpha)
+
+
+def _run_lengths(smoothed, thresholds):
+    """
+    Consecutive below-threshold count at each frame, one row per threshold
+    
+    Equals DrowsinessDetector.frame_counter after each processed frame.
+    """
+    below = smoothed[None, :] < np.asarray(thresholds)[:, None]
+    index = np.arange(smoothed.shape[0])
+    last_reset = np.maximum.accumulate(np.where(below, -1, index), axis=1)
+    return index - last_reset
+
+
+def sweep(trace, thresholds, consecutive_frames, window=5, alpha=0.5):
+    """
+    Replay the drowsiness state machine for every parameter combination
+    
+    The trace's frame skip is fixed at recording; sweep other FRAME_SKIP
+    values by recording a trace for each. Only the consecutive-frames EAR
+    rule is replayed; alerts raised by the fused fatigue score (which also
+    needs mouth and head pose signals) are not counted.
+    
+    Args:
+        trace: EARTrace
+        thresholds: EAR thresholds to try
+        consecutive_frames: CONSECUTIVE_FRAMES values to try
+        window, alpha: EAR smoothing parameters
+    
+    Returns:
+        list: One dict per configuration with the alert count, alerts per
+        hour, first alert time and the fraction of time flagged drowsy
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    consecutive_frames = np.asarray(consecutive_frames, dtype=np.int64)
+    hours = trace.duration / 3600.0
+    results = []
+    
+    timestamps, smoothed = _processed(trace, window, alpha)
+    if len(smoothed) == 0:
+        return results
+    
+    runs = _run_lengths(smoothed, thresholds)
+    
+    # One alert per below-threshold run that reaches the count, i.e. one
+    # per frame where run == C; histogram every row's run lengths at once
+    width = int(runs.max()) + 1
+    offsets = np.arange(len(thresholds))[:, None] * width
+    histogram = np.bincount((runs + offsets).ravel(), minlength=len(thresholds) * width)
+    histogram = histogram.reshape(len(thresholds), width)
+    # Frames at or beyond each run length (status 'drowsy')
+    at_least = np.cumsum(histogram[:, ::-1], axis=1)[:, ::-1]
+    
+    valid = consecutive_frames < width
+    columns = np.where(valid, consecutive_frames, 0)
+    alerts = np.where(valid, histogram[:, columns], 0)
+    drowsy = np.where(valid, at_least[:, columns], 0) / len(smoothed)
+    
+    for j, consecutive in enumerate(consecutive_frames):
+        hits = runs == consecutive
+        has_alert = hits.any(axis=1)
+        first = timestamps[hits.argmax(axis=1)] - trace.timestamps[0]
+        
+        for i, threshold in enumerate(thresholds):
+            results.append({
+                'threshold': round(float(threshold), 4),
+                'consecutive_frames': int(consecutive),
+                'frame_skip': trace.frame_skip,
+                'alerts': int(alerts[i, j]),
+                'alerts_per_hour': round(alerts[i, j] / hours, 2) if hours else 0.0,
+                'first_alert': round(float(first[i]), 2) if has_alert[i] else None,
+                'drowsy_fraction': round(float(drowsy[i, j]), 4),
+            })
+    
+    return results
+
+
+def alert_times(trace, threshold, consecutive_frames, window=5, alpha=0.5):
+    """
+    Times (seconds from the start) at which one configuration raises alerts
+    """
+    timestamps, smoothed = _processed(trace, window, alpha)
+    runs = _run_lengths(smoothed, [threshold])[0]
+    return timestamps[runs == consecutive_frames] - trace.timestamps[0]
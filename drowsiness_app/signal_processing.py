@@ -0,0 +1,212 @@
+"""
+Streaming EAR Signal Processing
+Student Eye Drowsiness Detection System
+This module smooths the per-frame EAR signal, detects blinks and fuses
+eye closure, yawning and nodding into a fatigue score. Every update is
+O(1): state lives in fixed-size buffers and running sums.
+"""
+
+from collections import deque
+
+
+class EARFilter:
+    """
+    Median filter followed by an exponential moving average
+    
+    The short median removes single-frame noise and blinks; the EMA
+    smooths what is left so the threshold isn't crossed by jitter.
+    """
+    
+    def __init__(self, window=5, alpha=0.5):
+        self.window = deque(maxlen=window)
+        self.alpha = alpha
+        self.value = None
+    
+    def update(self, ear):
+        """
+        Add a raw EAR sample
+        
+        Returns:
+            float: Smoothed EAR
+        """
+        self.window.append(ear)
+        
+        # Median of a fixed-size window (constant cost per sample)
+        ordered = sorted(self.window)
+        middle = len(ordered) // 2
+        if len(ordered) % 2:
+            median = ordered[middle]
+        else:
+            median = (ordered[middle - 1] + ordered[middle]) / 2.0
+        
+        if self.value is None:
+            self.value = median
+        else:
+            self.value = self.alpha * median + (1 - self.alpha) * self.value
+        
+        return self.value
+    
+    def reset(self):
+        """Clear the filter state"""
+        self.window.clear()
+        self.value = None
+
+
+class BlinkDetector:
+    """
+    Detect blinks as short eye closures in the raw EAR signal
+    
+    Closures longer than max_duration are not blinks (they are what the
+    drowsiness check looks for) and are not counted.
+    """
+    
+    def __init__(self, max_duration=0.5, rate_window=60.0, max_tracked=256):
+        self.max_duration = max_duration  # Seconds
+        self.rate_window = rate_window  # Seconds
+        self.closed_since = None
+        
+        # Recent blink times for the blink rate (bounded buffer)
+        self.recent_blinks = deque(maxlen=max_tracked)
+        
+        # Running totals for the mean blink duration
+        self.blink_count = 0
+        self.total_duration = 0.0
+    
+    def update(self, ear, threshold, timestamp):
+        """
+        Add a raw EAR sample
+        
+        Returns:
+            bool: True if a blink ended on this sample
+        """
+        if ear < threshold:
+            if self.closed_since is None:
+                self.closed_since = timestamp
+            return False
+        
+        if self.closed_since is None:
+            return False
+        
+        duration = timestamp - self.closed_since
+        self.closed_since = None
+        
+        if duration > self.max_duration:
+            return False
+        
+        self.blink_count += 1
+        self.total_duration += duration
+        self.recent_blinks.append(timestamp)
+        return True
+    
+    def blink_rate(self, now):
+        """
+        Blinks per minute over the last rate_window seconds
+        """
+        # Drop blinks that have left the window
+        while self.recent_blinks and now - self.recent_blinks[0] > self.rate_window:
+            self.recent_blinks.popleft()
+        return len(self.recent_blinks) * 60.0 / self.rate_window
+    
+    def mean_duration(self):
+        """Mean blink duration in seconds"""
+        return self.total_duration / self.blink_count if self.blink_count else 0.0
+    
+    def reset(self):
+        """Clear the blink state"""
+        self.closed_since = None
+        self.recent_blinks.clear()
+        self.blink_count = 0
+        self.total_duration = 0.0
+
+
+class FatigueEstimator:
+    """
+    Fuse eye closure, yawning and head nodding into a 0..1 fatigue score
+    
+    Each signal's level is the fraction of the recent window in which it
+    was active (for the eyes this is PERCLOS). The score is the weighted
+    mean of the levels of the signals that have data, so without face mesh
+    landmarks (Haar) it is the eye closure level alone.
+    """
+    
+    DEFAULT_WEIGHTS = {'eyes': 0.5, 'yawn': 0.3, 'nod': 0.2}
+    
+    def __init__(self, window=150, yawn_threshold=0.6, nod_degrees=15.0,
+                 baseline_alpha=0.02, weights=None):
+        self.window = window  # Processed frames
+        self.yawn_threshold = yawn_threshold  # Mouth aspect ratio of a yawn
+        self.nod_degrees = nod_degrees  # Forward pitch beyond the baseline
+        self.baseline_alpha = baseline_alpha  # EMA weight of the pitch baseline
+        self.weights = dict(weights or self.DEFAULT_WEIGHTS)
+        
+        self.history = {name: deque(maxlen=window) for name in self.weights}
+        self.active = {name: 0 for name in self.weights}  # Running sums
+        self.pitch_baseline = None
+        self.yawning = False
+        self.nodding = False
+        self.score = 0.0
+    
+    def _push(self, name, active):
+        history = self.history[name]
+        if len(history) == history.maxlen:
+            self.active[name] -= history[0]
+        history.append(int(active))
+        self.active[name] += int(active)
+    
+    def update(self, eyes_closed, mar=None, pitch=None):
+        """
+        Add one processed frame
+        
+        Args:
+            eyes_closed: Whether the (smoothed) EAR is below the threshold
+            mar: Mouth aspect ratio, or None if unavailable
+            pitch: Head pitch in degrees, or None if unavailable
+            
+        Returns:
+            float: Fatigue score between 0 and 1
+        """
+        self._push('eyes', eyes_closed)
+        
+        if mar is not None:
+            self.yawning = mar > self.yawn_threshold
+            self._push('yawn', self.yawning)
+        
+        if pitch is not None:
+            if self.pitch_baseline is None:
+                self.pitch_baseline = pitch
+            self.nodding = pitch - self.pitch_baseline > self.nod_degrees
+            # Follow slow posture changes, but not the nods themselves
+            if not self.nodding:
+                self.pitch_baseline += self.baseline_alpha * (pitch - self.pitch_baseline)
+            self._push('nod', self.nodding)
+        
+        total = 0.0
+        weight = 0.0
+        for name, level in self.levels().items():
+            if level is not None:
+                total += self.weights[name] * level
+                weight += self.weights[name]
+        self.score = total / weight if weight else 0.0
+        return self.score
+    
+    def levels(self):
+        """
+        Active fraction of each signal over the window (None without data)
+        
+        Fractions are of the full window, so a session's first frames
+        can't push the score up on their own.
+        """
+        return {
+            name: self.active[name] / self.window if history else None
+            for name, history in self.history.items()
+        }
+    
+    def reset(self):
+        """Clear the fatigue state"""
+        for name, history in self.history.items():
+            history.clear()
+            self.active[name] = 0
+        self.pitch_baseline = None
+        self.yawning = False
+        self.nodding = False
+        self.score = 0.0
@@ -0,0 +1,39 @@
+"""
+Static Asset Template Tags
+Student Eye Drowsiness Detection System
+This module inlines small static files (the critical CSS of the monitoring
+page) into templates, so the first render doesn't wait for a stylesheet
+request. The same files are still served hashed and precompressed for the
+other pages.
+"""
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+# Static path -> file contents (re-read on every render when DEBUG is on)
+_inlined = {}
+
+
+@register.simple_tag
+def inline_static(path):
+    """
+    Contents of a static file, for use inside <style> or <script>
+    
+    Args:
+        path: Path relative to the static directories (e.g. 'css/base.css')
+    
+    Returns:
+        str: The file contents, or an empty string if the file isn't found
+    """
+    if settings.DEBUG or path not in _inlined:
+        filename = finders.find(path)
+        if filename is None:
+            print(f"Warning: Static file '{path}' not found, nothing inlined")
+            return ''
+        with open(filename, encoding='utf-8') as f:
+            _inlined[path] = mark_safe(f.read())
+    return _inlined[path]
@@ -0,0 +1,152 @@
+"""
+Tests for Student Eye Drowsiness Detection System
+"""
+import os
+import tempfile
+from io import StringIO
+
+import cv2
+import numpy as np
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .analytics import refresh_rollups
+from .drowsiness_detector import DrowsinessDetector
+from .frame_sources import SyntheticSource
+from .landmark_cache import LandmarkCache
+from .multi_face import FaceTracker
+from .models import DailyRollup, SessionLog
+
+
+# Tests run with DEBUG off, where the manifest storage needs collectstatic;
+# plain storage renders {% static %} without it
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class CohortAnalyticsDateFilterTests(TestCase):
+    """Invalid date filters are rejected with a 400, not a server error"""
+    
+    def setUp(self):
+        staff = User.objects.create_user('instructor', password='instructor-pass', is_staff=True)
+        self.client.force_login(staff)
+    
+    def test_invalid_date_returns_400(self):
+        for url_name in ('cohort_analytics', 'cohort_analytics_api'):
+            for query in ({'start': '2024-02-30'}, {'end': '2024-13-01'}, {'start': 'yesterday'}):
+                with self.subTest(url=url_name, query=query):
+                    response = self.client.get(reverse(url_name), query)
+                    self.assertEqual(response.status_code, 400)
+    
+    def test_valid_dates_are_accepted(self):
+        for url_name in ('cohort_analytics', 'cohort_analytics_api'):
+            with self.subTest(url=url_name):
+                response = self.client.get(reverse(url_name), {'start': '2024-02-01', 'end': '2024-02-29'})
+                self.assertEqual(response.status_code, 200)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class ExportDateFilterTests(TestCase):
+    """Invalid export dates are reported, not raised"""
+    
+    def test_view_invalid_date_returns_400(self):
+        staff = User.objects.create_user('instructor', password='instructor-pass', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse('export_data'), {'start': '2024-02-30'})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_command_invalid_date_raises_command_error(self):
+        with self.assertRaisesMessage(CommandError, "Invalid --start date '2024-02-30'"):
+            call_command('export_sessions', '--start', '2024-02-30', stdout=StringIO())
+    
+    def test_command_writes_to_its_stdout(self):
+        output = StringIO()
+        call_command('export_sessions', '--start', '2024-02-01', stdout=output)
+        self.assertTrue(output.getvalue().startswith('session_id,username'))
+
+
+class RollupTests(TestCase):
+    """A session is counted in the rollups once, however many copies exist"""
+    
+    def test_stale_copy_does_not_undo_rollup(self):
+        user = User.objects.create_user('student', password='student-pass')
+        session = SessionLog.objects.create(user=user)
+        stale = SessionLog.objects.get(pk=session.pk)  # e.g. the copy in active_sessions
+        session.end_session()
+        
+        self.assertEqual(refresh_rollups(), 1)
+        stale.add_drowsy_alert()
+        stale.end_session()
+        
+        self.assertTrue(SessionLog.objects.get(pk=session.pk).rolled_up)
+        self.assertEqual(refresh_rollups(), 0)
+        self.assertEqual(sum(DailyRollup.objects.values_list('session_count', flat=True)), 1)
+
+
+class LandmarkCacheTests(TestCase):
+    """Cached results carry every fatigue signal, not just the EAR"""
+    
+    def test_round_trip_keeps_mouth_and_head_signals(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LandmarkCache(directory, max_entries=4)
+            cache.put(b'a' * 16, 0.27, [(1.0, 2.0)], mar=0.71, pitch=-12.5)
+            cache.put(b'b' * 16, None, [])
+            
+            self.assertEqual(cache.get(b'a' * 16), (0.27, [(1.0, 2.0)], 0.71, -12.5))
+            self.assertEqual(cache.get(b'b' * 16), (None, [], None, None))
+    
+    def test_older_format_is_replaced(self):
+        with tempfile.TemporaryDirectory() as directory:
+            old_dtype = np.dtype([('key', 'u1', (16,)), ('ear', '<f8'), ('last_used', '<u8')])
+            np.save(os.path.join(directory, LandmarkCache.FILENAME), np.zeros(3, dtype=old_dtype))
+            
+            cache = LandmarkCache(directory)
+            self.assertEqual(len(cache.entries), 3)
+            self.assertEqual(len(cache), 0)
+
+
+class HaarEyeOpennessTests(TestCase):
+    """The Haar openness estimate separates open from closed eyes"""
+    
+    def _openness(self, eyes_open):
+        detector = DrowsinessDetector(render_overlay=False, profile='haar')
+        gray = cv2.cvtColor(SyntheticSource()._draw_face(eyes_open), cv2.COLOR_BGR2GRAY)
+        # Face box the cascade finds on the synthetic face, default eye boxes
+        face_box = (159, 80, 320, 320)
+        ear, rects = detector._haar_eye_openness(gray, face_box, detector.HAAR_DEFAULT_EYE_BOXES)
+        self.assertEqual(len(rects), 2)
+        return ear, detector.EAR_THRESHOLD
+    
+    def test_open_eyes_are_above_threshold(self):
+        ear, threshold = self._openness(eyes_open=True)
+        self.assertGreater(ear, threshold + 0.05)
+    
+    def test_closed_eyes_are_below_threshold(self):
+        ear, threshold = self._openness(eyes_open=False)
+        self.assertLess(ear, threshold - 0.1)
+
+
+class FaceTrackerTests(TestCase):
+    """Assigned faces keep their IDs while briefly out of view"""
+    
+    def _lose_and_return(self, held_ids):
+        tracker = FaceTracker()
+        face_id = tracker.update([(0.5, 0.4)])[0].face_id
+        for _ in range(60):
+            tracker.update([], held_ids=held_ids(face_id))
+        # The head comes back up a little away from where it was lost
+        return face_id, tracker.update([(0.5, 0.6)], held_ids=held_ids(face_id))[0].face_id
+    
+    def test_held_face_keeps_its_id(self):
+        face_id, returned_id = self._lose_and_return(lambda face_id: [face_id])
+        self.assertEqual(returned_id, face_id)
+    
+    def test_unheld_face_gets_a_new_id(self):
+        face_id, returned_id = self._lose_and_return(lambda face_id: [])
+        self.assertNotEqual(returned_id, face_id)
@@ -20,8 +20,22 @@ urlpatterns = [
     path('session-report/<int:session_id>/', views.session_report, name='session_report'),
     path('session-history/', views.session_history, name='session_history'),
     
+    # Instructor analytics URLs
+    path('analytics/', views.cohort_analytics, name='cohort_analytics'),
+    path('api/analytics/cohort/', views.cohort_analytics_api, name='cohort_analytics_api'),
+    path('api/export/', views.export_data, name='export_data'),
+    path('api/profile/<int:user_id>/', views.profile_session, name='profile_session'),
+    
     # API endpoints
     path('api/drowsiness-alert/', views.drowsiness_alert, name='drowsiness_alert'),
     path('api/session-stats/', views.get_session_stats, name='session_stats'),
     path('video-feed/', views.video_feed, name='video_feed'),
+    path('metadata-feed/', views.metadata_feed, name='metadata_feed'),
+    
+    # Room (multi-face, multi-camera) monitoring URLs
+    path('room/<int:camera_index>/', views.room_monitor, name='room_monitor'),
+    path('room/<int:camera_index>/feed/', views.room_feed, name='room_feed'),
+    path('room/<int:camera_index>/stop/', views.stop_room, name='stop_room'),
+    path('api/room/<int:camera_index>/faces/', views.room_faces, name='room_faces'),
+    path('api/room/<int:camera_index>/assign/', views.assign_room_face, name='assign_room_face'),
 ]
\ No newline at end of file
@@ -4,25 +4,108 @@ Views for Student Eye Drowsiness Detection System
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from django.utils.timezone import localtime
-from django.db.models import Sum, Avg
+from django.db.models import Sum, Avg, Count
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from django.db import close_old_connections
 import json
 import cv2
 import threading
+from contextlib import closing
+from datetime import datetime, timezone as dt_timezone
 import time
-from .models import SessionLog, UserProfile
+from .models import SessionLog, UserProfile, SESSION_REPORT_CACHE_KEY
 from .drowsiness_detector import DrowsinessDetector
+from .camera_hub import CameraHub
+from .frame_sources import open_source, FrameSourceError
+from .alerts import CallbackSink, get_dispatcher
+from .lifecycle import SessionLifecycleManager
+from .detector_profiles import DETECTOR_PROFILES, resolve_profile
+from .profiling import MAX_DURATION, profile_thread
+from .analytics import rollup_session, cohort_report
+from .exports import export_stream, parse_filter_date, EXPORT_KINDS, EXPORT_FORMATS, CONTENT_TYPES
 
 
 # Global variables for video streaming
 active_detectors = {}
 active_sessions = {}
 
+# Detector profile chosen for a session (else the deployment default)
+session_profiles = {}
+
+# Thread running each user's detection loop, for on-demand profiling
+detection_threads = {}
+
+# Room cameras for multi-face monitoring (one capture thread per camera)
+camera_hub = CameraHub()
+
+# Overlay/stream modes for the monitoring page
+STREAM_MODES = ('server', 'client', 'metadata')
+
+# Metadata stream polling (~30 Hz, keepalive comment every ~5 s)
+METADATA_POLL_INTERVAL = 0.033
+METADATA_KEEPALIVE_POLLS = 150
+
+# Frames captured ahead of detection (overlaps camera reads with processing)
+FRAME_PREFETCH = 2
+
+
+def _record_alert(alert):
+    """
+    Alert sink: log a detector alert on the student's active session
+    """
+    # One lookup: end_active_session may pop the entry concurrently
+    session = active_sessions.get(alert.user_id)
+    if session is None:
+        return
+    # Runs on the dispatcher thread, outside any request
+    close_old_connections()
+    session.add_drowsy_alert(alert.isoformat())
+
+
+# Alerts are delivered on the dispatcher's worker thread; every alert is
+# recorded, while sound/browser/webhook notifications are rate limited
+alert_dispatcher = get_dispatcher()
+alert_dispatcher.add_sink(CallbackSink(_record_alert, name='database'))
+
+
+def _end_idle_session(user_id, last_seen):
+    """
+    End a session whose stream stopped being consumed, at its last frame
+    """
+    # Runs on the sweeper thread, outside any request
+    close_old_connections()
+    end_active_session(user_id, end_time=datetime.fromtimestamp(last_seen, tz=dt_timezone.utc))
+
+
+# Ends sessions whose browser went away without stopping monitoring and
+# closes their streams (releasing the camera and detector)
+session_lifecycle = SessionLifecycleManager(
+    idle_timeout=settings.SEDDS_SESSION_IDLE_TIMEOUT,
+    sweep_interval=settings.SEDDS_SESSION_SWEEP_INTERVAL,
+    on_idle=_end_idle_session,
+)
+
+
+def _keep_room_sessions_alive(camera_index, user_ids):
+    """
+    Camera worker keepalive: students assigned to a running room camera
+    are being monitored, so their sessions aren't idle
+    """
+    for user_id in user_ids:
+        session_lifecycle.touch(user_id)
+
+
+camera_hub.on_frame = _keep_room_sessions_alive
+
 
 def home(request):
     """
@@ -133,30 +216,37 @@ def dashboard(request):
     except UserProfile.DoesNotExist:
         profile = UserProfile.objects.create(user=request.user)
     
-    # Get recent sessions
+    # Get recent sessions (lazy, not queried when the fragment is cached)
     recent_sessions = SessionLog.objects.filter(user=request.user)[:5]
     
-    # Calculate statistics
-    total_sessions = SessionLog.objects.filter(user=request.user).count()
-    total_alerts = SessionLog.objects.filter(user=request.user).aggregate(
-        total=Sum('alert_count')
-    )['total'] or 0
-    
-    avg_alerts = SessionLog.objects.filter(user=request.user).aggregate(
-        avg=Avg('alert_count')
-    )['avg'] or 0
-    
     context = {
         'profile': profile,
         'recent_sessions': recent_sessions,
-        'total_sessions': total_sessions,
-        'total_alerts': total_alerts,
-        'avg_alerts': round(avg_alerts, 2),
+        'stats': SimpleLazyObject(lambda: _session_totals(request.user)),
+        'fragment_timeout': settings.SEDDS_FRAGMENT_CACHE_TIMEOUT,
+        'detector_profiles': DETECTOR_PROFILES,
+        'default_profile': settings.SEDDS_DETECTOR_PROFILE,
     }
     
     return render(request, 'drowsiness_app/dashboard.html', context)
 
 
+def _session_totals(user):
+    """
+    Session count and alert totals for the dashboard
+    """
+    totals = SessionLog.objects.filter(user=user).aggregate(
+        total_sessions=Count('id'),
+        total_alerts=Sum('alert_count'),
+        avg_alerts=Avg('alert_count'),
+    )
+    return {
+        'total_sessions': totals['total_sessions'],
+        'total_alerts': totals['total_alerts'] or 0,
+        'avg_alerts': round(totals['avg_alerts'] or 0, 2),
+    }
+
+
 @login_required
 def start_monitoring(request):
     """
@@ -170,9 +260,21 @@ def start_monitoring(request):
     # Create new session
     session = SessionLog.objects.create(user=request.user)
     active_sessions[user_id] = session
+    session_lifecycle.register(user_id)
+    
+    # Per-session detector profile (e.g. a cheaper one on an old lab PC)
+    if request.GET.get('profile') in DETECTOR_PROFILES:
+        session_profiles[user_id] = request.GET['profile']
+    
+    # Calibrate first-time users, or on request
+    calibrate = (request.GET.get('recalibrate') == '1' or
+                 UserProfile.get_ear_threshold(user_id) is None)
     
     return render(request, 'drowsiness_app/monitoring.html', {
-        'session_id': session.id
+        'session_id': session.id,
+        'stream_mode': _stream_mode(request),
+        'calibrate': calibrate,
+        'detector_profile': _detector_profile(user_id),
     })
 
 
@@ -193,22 +295,33 @@ def stop_monitoring(request):
     return redirect('dashboard')
 
 
-def end_active_session(user_id):
+def end_active_session(user_id, end_time=None):
     """
     Helper function to end active session
+    
+    Args:
+        user_id: Session owner
+        end_time: When the session ended (default: now)
     """
-    if user_id in active_sessions:
-        session = active_sessions[user_id]
-        session.end_session()
-        
-        # Stop detector if running
-        if user_id in active_detectors:
-            active_detectors[user_id].stop_detection()
-            del active_detectors[user_id]
-        
-        del active_sessions[user_id]
-        return session
-    return None
+    # Pop first: the request thread and the idle sweeper may race here
+    session = active_sessions.pop(user_id, None)
+    
+    # Stop detector if running (its stream exits at the next frame)
+    detector = active_detectors.pop(user_id, None)
+    if detector is not None:
+        detector.stop_detection()
+    
+    # Close abandoned streams, releasing their camera and detector
+    session_lifecycle.release(user_id)
+    session_profiles.pop(user_id, None)
+    
+    if session is None:
+        return None
+    
+    session.end_session(end_time)
+    rollup_session(session)
+    alert_dispatcher.forget(f"user:{user_id}")
+    return session
 
 
 @login_required
@@ -217,20 +330,22 @@ def session_report(request, session_id):
     Display session report
     """
     try:
-        session = SessionLog.objects.get(id=session_id, user=request.user)
+        # Ended sessions don't change, so their report data is cached
+        # until the session is saved again
+        cache_key = SESSION_REPORT_CACHE_KEY.format(session_id=session_id)
+        context = cache.get(cache_key)
         
-        # Parse drowsy timestamps
-        drowsy_times = []
-        if session.drowsy_timestamps:
-            if isinstance(session.drowsy_timestamps, str):
-                drowsy_times = json.loads(session.drowsy_timestamps)
-            else:
-                drowsy_times = session.drowsy_timestamps
+        if context is None:
+            session = SessionLog.objects.get(id=session_id)
+            context = {
+                'session': session,
+                'drowsy_times': session.get_drowsy_times(),
+            }
+            if session.session_end is not None:
+                cache.set(cache_key, context, None)
         
-        context = {
-            'session': session,
-            'drowsy_times': drowsy_times,
-        }
+        if context['session'].user_id != request.user.id:
+            raise SessionLog.DoesNotExist
         
         return render(request, 'drowsiness_app/session_report.html', context)
         
@@ -244,15 +359,105 @@ def session_history(request):
     """
     Display user's session history
     """
+    # Lazy, not queried when the fragment is cached
     sessions = SessionLog.objects.filter(user=request.user).order_by('-session_start')
     
     context = {
         'sessions': sessions,
+        'fragment_timeout': settings.SEDDS_FRAGMENT_CACHE_TIMEOUT,
     }
     
     return render(request, 'drowsiness_app/session_history.html', context)
 
 
+def _date_param(request, name):
+    """
+    Read an optional YYYY-MM-DD query parameter
+    
+    Raises:
+        ValueError: If the value isn't a valid date (e.g. 2024-02-30)
+    """
+    return parse_filter_date(request.GET.get(name, ''), f'{name} date')
+
+
+def _cohort_filters(request):
+    """
+    Read the batch and date range filters for cohort analytics
+    
+    Raises:
+        ValueError: If a date filter is invalid
+    """
+    return {
+        'batch_year': request.GET.get('batch') or None,
+        'start_date': _date_param(request, 'start'),
+        'end_date': _date_param(request, 'end'),
+    }
+
+
+@staff_member_required
+def cohort_analytics(request):
+    """
+    Instructor analytics across batches (from precomputed rollups)
+    """
+    try:
+        filters = _cohort_filters(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    report = cohort_report(**filters)
+    
+    context = {
+        'report': report,
+        'filters': filters,
+        'batch_options': UserProfile.objects.exclude(batch_year__isnull=True).exclude(
+            batch_year='').values_list('batch_year', flat=True).distinct().order_by('batch_year'),
+    }
+    
+    return render(request, 'drowsiness_app/cohort_analytics.html', context)
+
+
+@staff_member_required
+def cohort_analytics_api(request):
+    """
+    Cohort analytics as JSON
+    """
+    try:
+        filters = _cohort_filters(request)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    report = cohort_report(**filters)
+    return JsonResponse({'status': 'success', **report})
+
+
+@staff_member_required
+def export_data(request):
+    """
+    Stream session or alert data as CSV or NDJSON
+    
+    Query parameters: kind (sessions|alerts), format (csv|ndjson),
+    user, batch, start and end (YYYY-MM-DD).
+    """
+    kind = request.GET.get('kind', 'sessions')
+    fmt = request.GET.get('format', 'csv')
+    
+    if kind not in EXPORT_KINDS or fmt not in EXPORT_FORMATS:
+        return JsonResponse({'status': 'error', 'message': 'Invalid export kind or format.'}, status=400)
+    
+    try:
+        filters = _cohort_filters(request)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    chunks = export_stream(
+        kind=kind,
+        fmt=fmt,
+        username=request.GET.get('user') or None,
+        **filters
+    )
+    
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="sedds_{kind}.{fmt}"'
+    return response
+
+
 @csrf_exempt
 @login_required
 def drowsiness_alert(request):
@@ -274,38 +479,105 @@ def drowsiness_alert(request):
     return JsonResponse({'status': 'error'})
 
 
-def generate_video_feed(user_id):
+def _stream_mode(request):
     """
-    Generate video feed for streaming
+    Resolve the overlay/stream mode for a monitoring page
+    
+    'server' burns the overlay into the MJPEG stream, 'client' streams raw
+    video plus metadata, and 'metadata' streams metadata only (no video).
     """
-    detector = DrowsinessDetector()
+    mode = request.GET.get('mode', settings.SEDDS_STREAM_MODE)
+    if mode not in STREAM_MODES:
+        mode = settings.SEDDS_STREAM_MODE
+    return mode
+
+
+def _detector_profile(user_id):
+    """
+    Detector profile for the user's session
+    
+    The session's choice, else SEDDS_DETECTOR_PROFILE ('auto' benchmarks
+    the profiles the first time it is resolved).
+    """
+    profile = session_profiles.get(user_id, settings.SEDDS_DETECTOR_PROFILE)
+    return resolve_profile(profile, settings.SEDDS_DETECTOR_TARGET_MS)
+
+
+def _create_detector(user_id, render_overlay=True, calibrate=False):
+    """
+    Create a detector for the user and wire its callbacks and alerts
+    
+    The user's calibrated threshold is used unless calibrate is set, in
+    which case the session starts with a calibration phase.
+    """
+    ear_threshold = None if calibrate else UserProfile.get_ear_threshold(user_id)
+    detector = DrowsinessDetector(render_overlay=render_overlay,
+                                  ear_threshold=ear_threshold,
+                                  calibrate=calibrate,
+                                  profile=_detector_profile(user_id))
     active_detectors[user_id] = detector
     
-    # Set up callbacks
-    def on_drowsiness():
-        if user_id in active_sessions:
-            session = active_sessions[user_id]
-            session.add_drowsy_alert()
+    def on_calibration_complete(threshold):
+        profile, _ = UserProfile.objects.get_or_create(user_id=user_id)
+        profile.set_ear_threshold(threshold)
     
-    detector.on_drowsiness_detected = on_drowsiness
+    detector.on_calibration_complete = on_calibration_complete
     
-    # Start camera
-    cap = cv2.VideoCapture(0)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    # Alerts are recorded by the dispatcher's database sink
+    detector.alert_key = f"user:{user_id}"
+    detector.alert_user_id = user_id
+    return detector
+
+
+def _run_detection(user_id, detector):
+    """
+    Capture frames and run detection while the user's detector is active
+    
+    Yields:
+        tuple: (processed_frame, ear_value, is_drowsy)
+    """
+    # Camera (or the configured SEDDS_VIDEO_SOURCE), paced to its frame rate
+    source = open_source(size=(640, 480), prefetch=FRAME_PREFETCH)
+    frames = None
+    thread_id = threading.get_ident()
+    detection_threads[user_id] = thread_id
     
     try:
-        while user_id in active_detectors:
-            ret, frame = cap.read()
-            if not ret:
+        frames = iter(source)
+        for timestamp, frame in frames:
+            if active_detectors.get(user_id) is not detector:
                 break
             
-            # Flip frame horizontally
-            frame = cv2.flip(frame, 1)
+            # The consumer is still reading the stream
+            session_lifecycle.touch(user_id)
             
             # Process frame
-            processed_frame, ear_value, is_drowsy = detector.process_frame(frame)
-            
+            yield detector.process_frame(frame, timestamp)
+    
+    except FrameSourceError as e:
+        print(f"Warning: {e}")
+    
+    finally:
+        # Stop the prefetch thread before releasing the device
+        if frames is not None:
+            frames.close()
+        source.close()
+        if active_detectors.get(user_id) is detector:
+            del active_detectors[user_id]
+        if detection_threads.get(user_id) == thread_id:
+            del detection_threads[user_id]
+        detector.release()
+
+
+def generate_video_feed(user_id, render_overlay=True, calibrate=False):
+    """
+    Generate video feed for streaming
+    """
+    detector = _create_detector(user_id, render_overlay=render_overlay, calibrate=calibrate)
+    
+    # closing() runs the detection cleanup as soon as this generator is closed
+    with closing(_run_detection(user_id, detector)) as results:
+        for processed_frame, ear_value, is_drowsy in results:
             if processed_frame is not None:
                 # Encode frame as JPEG
                 ret, buffer = cv2.imencode('.jpg', processed_frame)
@@ -313,28 +585,106 @@ def generate_video_feed(user_id):
                     frame_bytes = buffer.tobytes()
                     yield (b'--frame\r\n'
                            b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            
-            time.sleep(0.033)  # ~30 FPS
-            
-    finally:
-        cap.release()
-        if user_id in active_detectors:
-            del active_detectors[user_id]
+
+
+def _sse_event(payload, event=None):
+    """
+    Encode a metadata dict as a compact server-sent event
+    """
+    data = f"data: {json.dumps(payload, separators=(',', ':'))}\n\n"
+    if event:
+        data = f"event: {event}\n" + data
+    return data.encode()
+
+
+def _alert_events(user_id):
+    """
+    Pending browser alerts for the user as 'alert' events
+    """
+    browser = alert_dispatcher.get_sink('browser')
+    if browser is None:
+        return b''
+    return b''.join(_sse_event(alert, event='alert') for alert in browser.pop(user_id))
+
+
+def generate_metadata_feed(user_id, headless=False, calibrate=False):
+    """
+    Generate a server-sent event stream of per-frame detection metadata
+    
+    With headless=True the stream drives the camera itself (no video);
+    otherwise it follows the detector owned by the user's video feed.
+    """
+    if headless:
+        detector = _create_detector(user_id, render_overlay=False, calibrate=calibrate)
+        with closing(_run_detection(user_id, detector)) as results:
+            for _ in results:
+                # Only processed frames carry new detection results
+                if detector.frame_count % detector.FRAME_SKIP == 0:
+                    yield _sse_event(detector.get_frame_metadata()) + _alert_events(user_id)
+        return
+    
+    last_frame = None
+    idle_polls = 0
+    while user_id in active_sessions:
+        detector = active_detectors.get(user_id)
+        if detector is not None and detector.frame_count != last_frame:
+            last_frame = detector.frame_count
+            idle_polls = 0
+            yield _sse_event(detector.get_frame_metadata()) + _alert_events(user_id)
+        else:
+            idle_polls += 1
+            # Keep the connection alive while waiting for the video feed
+            if idle_polls % METADATA_KEEPALIVE_POLLS == 0:
+                yield b': keepalive\n\n'
+        
+        time.sleep(METADATA_POLL_INTERVAL)
 
 
 @login_required
 def video_feed(request):
     """
     Video streaming endpoint
+    
+    Pass ?overlay=client to stream raw frames without the server overlay,
+    and ?calibrate=1 to start with threshold calibration.
     """
     user_id = request.user.id
+    render_overlay = request.GET.get('overlay', 'server') != 'client'
+    calibrate = request.GET.get('calibrate') == '1'
+    
+    stream = generate_video_feed(user_id, render_overlay=render_overlay, calibrate=calibrate)
+    session_lifecycle.attach(user_id, stream)
     
     return StreamingHttpResponse(
-        generate_video_feed(user_id),
+        stream,
         content_type='multipart/x-mixed-replace; boundary=frame'
     )
 
 
+@login_required
+def metadata_feed(request):
+    """
+    Detection metadata streaming endpoint (server-sent events)
+    
+    Pass ?video=none to run detection without a video stream
+    (?calibrate=1 as for the video feed).
+    """
+    user_id = request.user.id
+    headless = request.GET.get('video') == 'none'
+    calibrate = request.GET.get('calibrate') == '1'
+    
+    stream = generate_metadata_feed(user_id, headless=headless, calibrate=calibrate)
+    session_lifecycle.attach(user_id, stream)
+    
+    response = StreamingHttpResponse(
+        stream,
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def get_session_stats(request):
     """
@@ -352,11 +702,211 @@ def get_session_stats(request):
         # Convert session start time to local timezone
         local_start_time = localtime(session.session_start)
         
-        return JsonResponse({
+        stats = {
             'status': 'active',
             'alert_count': session.alert_count,
             'duration': duration_str,
             'session_start': local_start_time.strftime('%H:%M:%S')
-        })
+        }
+        
+        # Blink statistics from the running detector
+        detector = active_detectors.get(user_id)
+        if detector is not None:
+            detector_stats = detector.get_statistics()
+            stats['blink_count'] = detector_stats['blink_count']
+            stats['blink_rate'] = round(detector_stats['blink_rate'], 1)
+            stats['mean_blink_duration'] = round(detector_stats['mean_blink_duration'], 3)
+            stats['fatigue_score'] = round(detector_stats['fatigue_score'], 3)
+        
+        return JsonResponse(stats)
     
-    return JsonResponse({'status': 'inactive'})
\ No newline at end of file
+    return JsonResponse({'status': 'inactive'})
+
+
+@staff_member_required
+def profile_session(request, user_id):
+    """
+    Sample a student's stream loop and return per-stage timings and
+    collapsed stacks (for flame graphs)
+    
+    Query parameters: seconds (default 5), interval (sampling interval in
+    ms, default 5) and format (json, or collapsed for the raw stacks file).
+    """
+    thread_id = detection_threads.get(user_id)
+    detector = active_detectors.get(user_id)
+    if thread_id is None or detector is None:
+        return JsonResponse({'status': 'error', 'message': 'No active stream for this student.'}, status=404)
+    
+    try:
+        seconds = min(float(request.GET.get('seconds', 5)), MAX_DURATION)
+        interval = max(float(request.GET.get('interval', 5)), 1.0) / 1000.0
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid seconds or interval.'}, status=400)
+    
+    result = profile_thread(thread_id, seconds, interval=interval,
+                            frame_counter=lambda: detector.frame_count)
+    
+    if request.GET.get('format') == 'collapsed':
+        response = HttpResponse(result['collapsed'], content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="sedds_profile_{user_id}.collapsed"'
+        return response
+    
+    return JsonResponse({
+        'status': 'success',
+        'user_id': user_id,
+        'detector_profile': detector.profile,
+        **result,
+    })
+
+
+def _room_key(camera_index):
+    """Lifecycle key of a room camera"""
+    return f"camera:{camera_index}"
+
+
+def _start_room(camera_index):
+    """
+    Start (or return the running) worker for a room camera, with the
+    deployment's detector profile
+    
+    The camera counts as in use while its feed or faces are being read;
+    once nobody has for the idle timeout, the sweeper stops it and ends
+    its students' sessions.
+    """
+    profile = resolve_profile(settings.SEDDS_DETECTOR_PROFILE, settings.SEDDS_DETECTOR_TARGET_MS)
+    worker = camera_hub.start(camera_index, profile=profile)
+    session_lifecycle.register(_room_key(camera_index),
+                               on_idle=lambda key, last_seen: _end_idle_room(camera_index))
+    return worker
+
+
+def _end_idle_room(camera_index):
+    """Stop a room camera nobody is watching (on the sweeper thread)"""
+    close_old_connections()
+    _stop_room(camera_index)
+
+
+def _stop_room(camera_index):
+    """
+    Stop a room camera and end its students' sessions
+    
+    Returns:
+        CameraWorker: The stopped worker, or None
+    """
+    session_lifecycle.release(_room_key(camera_index))
+    worker = camera_hub.stop(camera_index)
+    if worker is not None:
+        for user_id in list(worker.face_owners.values()):
+            end_active_session(user_id)
+    return worker
+
+
+def _room_stream(worker, camera_index):
+    """
+    A room camera's MJPEG stream, recording viewer activity per frame
+    """
+    key = _room_key(camera_index)
+    for chunk in worker.stream():
+        session_lifecycle.touch(key)
+        yield chunk
+
+
+@staff_member_required
+def room_monitor(request, camera_index):
+    """
+    Multi-face monitoring page for a shared room camera
+    """
+    _start_room(camera_index)
+    
+    return render(request, 'drowsiness_app/room_monitor.html', {
+        'camera_index': camera_index,
+    })
+
+
+@staff_member_required
+def room_feed(request, camera_index):
+    """
+    Room camera video streaming endpoint (shared by all viewers)
+    """
+    worker = _start_room(camera_index)
+    
+    return StreamingHttpResponse(
+        _room_stream(worker, camera_index),
+        content_type='multipart/x-mixed-replace; boundary=frame'
+    )
+
+
+@staff_member_required
+def room_faces(request, camera_index):
+    """
+    Get tracked faces and their assigned students for a room camera
+    """
+    worker = camera_hub.get(camera_index)
+    
+    if worker is None:
+        return JsonResponse({'status': 'inactive'})
+    session_lifecycle.touch(_room_key(camera_index))
+    
+    faces = worker.get_faces()
+    user_ids = [face['user_id'] for face in faces if face['user_id'] is not None]
+    usernames = dict(User.objects.filter(id__in=user_ids).values_list('id', 'username'))
+    for face in faces:
+        face['username'] = usernames.get(face['user_id'])
+    
+    return JsonResponse({
+        'status': 'active' if worker.is_alive() else 'stopped',
+        'error': worker.error,
+        'faces': faces,
+    })
+
+
+@staff_member_required
+def assign_room_face(request, camera_index):
+    """
+    Map a tracked face to a student (blank username to unassign)
+    
+    Assigning starts a session for the student; unassigning ends it.
+    """
+    worker = camera_hub.get(camera_index)
+    
+    if request.method != 'POST' or worker is None:
+        return JsonResponse({'status': 'error'})
+    
+    try:
+        face_id = int(request.POST.get('face_id'))
+    except (TypeError, ValueError):
+        return JsonResponse({'status': 'error', 'message': 'Invalid face ID.'})
+    
+    username = request.POST.get('username', '').strip()
+    
+    if not username:
+        user_id = worker.assign_face(face_id, None)
+        if user_id is not None:
+            end_active_session(user_id)
+        return JsonResponse({'status': 'success', 'face_id': face_id, 'username': None})
+    
+    try:
+        user = User.objects.get(username=username)
+    except User.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': 'Student not found.'})
+    
+    worker.assign_face(face_id, user.id, ear_threshold=UserProfile.get_ear_threshold(user.id))
+    if user.id not in active_sessions:
+        active_sessions[user.id] = SessionLog.objects.create(user=user)
+        # Kept alive by the camera worker; ended if the worker stops
+        session_lifecycle.register(user.id)
+    
+    return JsonResponse({'status': 'success', 'face_id': face_id, 'username': user.username})
+
+
+@staff_member_required
+def stop_room(request, camera_index):
+    """
+    Stop a room camera and end its students' sessions
+    """
+    worker = _stop_room(camera_index)
+    
+    if worker is not None:
+        messages.success(request, f'Room camera {camera_index} stopped.')
+    
+    return redirect('dashboard')
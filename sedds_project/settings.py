@@ -5,6 +5,7 @@ Student Eye Drowsiness Detection System
 
 from pathlib import Path
 import os
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -30,12 +31,14 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    'whitenoise.runserver_nostatic',  # runserver serves static files like production
     'django.contrib.staticfiles',
     'drowsiness_app',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -66,13 +69,43 @@ WSGI_APPLICATION = 'sedds_project.wsgi.application'
 
 
 # Database
-# Using SQLite for easier setup (can be changed to MongoDB later)
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite by default; set DB_ENGINE (and DB_NAME, DB_USER, ...) in the
+# environment or a .env file to use a server database such as PostgreSQL
+DB_ENGINE = config('DB_ENGINE', default='django.db.backends.sqlite3')
+
+if DB_ENGINE == 'django.db.backends.sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                # Seconds a writer waits for a lock before "database is locked"
+                'timeout': config('DB_TIMEOUT', default=20, cast=int),
+            },
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': config('DB_NAME', default='sedds'),
+            'USER': config('DB_USER', default=''),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default=''),
+            # Required behind a transaction-pooling proxy such as PgBouncer
+            'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
+        }
+    }
+
+# Persistent connections (seconds, 0 closes after each request)
+DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+
+# SQLite PRAGMAs applied to every new connection (see drowsiness_app.db):
+# WAL lets page reads run alongside alert writes from streaming threads
+SQLITE_JOURNAL_MODE = config('SQLITE_JOURNAL_MODE', default='WAL')
+SQLITE_SYNCHRONOUS = config('SQLITE_SYNCHRONOUS', default='NORMAL')
 
 
 # Password validation
@@ -113,6 +146,25 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# `python manage.py collectstatic` copies the static files to STATIC_ROOT
+# with content-hashed names (css/base.3f2a9c1b7e4d.css) and writes gzip and
+# brotli (if the Brotli package is installed) variants next to them.
+# WhiteNoise serves the hashed files with a far-future immutable
+# Cache-Control header and picks the precompressed variant the browser
+# accepts. With DEBUG on, files are served unhashed from STATICFILES_DIRS.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Seconds static files without a hash in their name may be cached
+WHITENOISE_MAX_AGE = config('WHITENOISE_MAX_AGE', default=0 if DEBUG else 3600, cast=int)
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -127,6 +179,54 @@ LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/'
 
+# Cache
+# Local memory by default (per process); use the file backend
+# (django.core.cache.backends.filebased.FileBasedCache, LOCATION a directory)
+# or a shared cache server when running several worker processes
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='sedds'),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+    }
+}
+
+# Seconds rendered history/dashboard fragments are kept (they are also
+# invalidated whenever one of the user's sessions changes)
+SEDDS_FRAGMENT_CACHE_TIMEOUT = config('SEDDS_FRAGMENT_CACHE_TIMEOUT', default=3600, cast=int)
+
 # Session settings
+# Sessions are read from the cache and written through to the database
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.cached_db')
 SESSION_COOKIE_AGE = 3600  # 1 hour
-SESSION_EXPIRE_AT_BROWSER_CLOSE = True
\ No newline at end of file
+SESSION_EXPIRE_AT_BROWSER_CLOSE = True
+
+# Monitoring stream mode: 'server' draws the overlay into the video stream,
+# 'client' streams raw video plus a metadata stream drawn by the browser,
+# 'metadata' streams detection metadata only (no video)
+SEDDS_STREAM_MODE = config('SEDDS_STREAM_MODE', default='server')
+
+# Video source for monitoring sessions: a camera index, a video file path or
+# stream URL, or 'synthetic' (generated frames, no camera needed)
+SEDDS_VIDEO_SOURCE = config('SEDDS_VIDEO_SOURCE', default='0')
+
+# Detector profile for monitoring sessions ('accurate', 'balanced', 'fast',
+# 'haar'; see drowsiness_app/detector_profiles.py), or 'auto' to benchmark
+# the profiles once per process and use the most accurate one whose p95
+# per-frame latency is within SEDDS_DETECTOR_TARGET_MS
+SEDDS_DETECTOR_PROFILE = config('SEDDS_DETECTOR_PROFILE', default='accurate')
+SEDDS_DETECTOR_TARGET_MS = config('SEDDS_DETECTOR_TARGET_MS', default=20.0, cast=float)
+
+# Monitoring sessions whose stream hasn't been read for this many seconds
+# (e.g. the tab was closed) are ended at their last frame and their camera
+# and detector released; the sweeper checks every SWEEP_INTERVAL seconds
+SEDDS_SESSION_IDLE_TIMEOUT = config('SEDDS_SESSION_IDLE_TIMEOUT', default=30.0, cast=float)
+SEDDS_SESSION_SWEEP_INTERVAL = config('SEDDS_SESSION_SWEEP_INTERVAL', default=5.0, cast=float)
+
+# Drowsiness alert delivery: sinks notified on the alert worker thread
+# ('sound', 'browser', 'log', 'webhook'), the webhook URL, and the minimum
+# seconds between notifications for the same session (every alert is still
+# recorded in the session log)
+SEDDS_ALERT_SINKS = config('SEDDS_ALERT_SINKS', default='sound,browser,log', cast=Csv())
+SEDDS_ALERT_WEBHOOK_URL = config('SEDDS_ALERT_WEBHOOK_URL', default='')
+SEDDS_ALERT_MIN_INTERVAL = config('SEDDS_ALERT_MIN_INTERVAL', default=5.0, cast=float)
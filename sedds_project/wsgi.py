@@ -13,4 +13,12 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sedds_project.settings')
 
-application = get_wsgi_application()
\ No newline at end of file
+application = get_wsgi_application()
+
+# With SEDDS_DETECTOR_PROFILE=auto, benchmark the detector profiles in the
+# background now rather than in the first monitoring request
+from django.conf import settings
+from drowsiness_app.detector_profiles import AUTO_PROFILE, start_auto_benchmark
+
+if settings.SEDDS_DETECTOR_PROFILE == AUTO_PROFILE:
+    start_auto_benchmark(settings.SEDDS_DETECTOR_TARGET_MS)